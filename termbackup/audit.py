@@ -1,59 +1,256 @@
 """
 Security audit logging with structured JSON-Lines.
 """
+import atexit
 import json
+import os
+import queue
+import threading
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple
 
 from .config import get_config_dir
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+# Maximum number of queued events the writer thread joins into a single write.
+BATCH_SIZE = 64
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+@lru_cache(maxsize=1)
+def _audit_path() -> Path:
+    return get_config_dir() / "audit.jsonl"
+
+@lru_cache(maxsize=1)
+def _fallback_path() -> Path:
+    return get_config_dir() / "audit_fallback.log"
+
+_ts_prefix: Tuple[int, str] = (-1, "")
+
+def _format_timestamp(ts: float) -> str:
+    """Format a UTC ISO-8601 timestamp, reusing the date/time prefix within the same second."""
+    global _ts_prefix
+    sec = int(ts)
+    cached_sec, prefix = _ts_prefix
+    if sec != cached_sec:
+        prefix = datetime.fromtimestamp(sec, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        _ts_prefix = (sec, prefix)
+    return f"{prefix}.{int((ts - sec) * 1_000_000):06d}+00:00"
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+def _dumps_line(entry: Dict[str, Any]) -> bytes:
+    """Serialize an audit entry to a single newline-terminated JSON line."""
+    if orjson is not None:
+        return orjson.dumps(
+            entry,
+            default=str,
+            option=orjson.OPT_APPEND_NEWLINE,
+        )
+    return (json.dumps(entry, default=_json_default) + "\n").encode("utf-8")
+
+def format_details(details: Dict[str, Any]) -> str:
+    """Render event details as compact JSON for display."""
+    if orjson is not None:
+        return orjson.dumps(details, default=str).decode("utf-8")
+    return json.dumps(details, default=_json_default, separators=(",", ":"))
+
+def _loads(line: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+_STOP = object()
+
+SECRET_KEYS = frozenset({"password", "passphrase", "token", "secret", "key", "api_key"})
+
+def _is_secret_key(name: str) -> bool:
+    """Match exact secret field names as well as variants like 'github_token'."""
+    lowered = name.lower()
+    return lowered in SECRET_KEYS or any(s in lowered for s in SECRET_KEYS)
+
 
 class AuditLogger:
-    """Writes structured JSONL audit logs without sensitive data."""
-    def __init__(self):
-        self.log_file = get_config_dir() / "audit.jsonl"
+    """
+    Writes structured JSONL audit logs without sensitive data.
+    Events are queued and written by a background thread so callers never wait on disk I/O.
+    Set TERMBACKUP_SYNC_AUDIT=1 to write synchronously instead.
+    """
+    def __init__(self) -> None:
+        self.log_file = _audit_path()
+        self._fh: Optional[IO[bytes]] = None
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._sync = os.environ.get("TERMBACKUP_SYNC_AUDIT") == "1"
+        atexit.register(self.close)
         
     def log(self, event_type: str, **kwargs: Any) -> None:
         """Log a structured security/operation event."""
-        entry: Dict[str, Any] = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "event": event_type,
-            "details": kwargs
-        }
-        
         # Ensure no passwords or deep secrets are in kwargs
-        for key in ["password", "token", "secret", "key"]:
-            if key in entry["details"]:
-                entry["details"][key] = "*****"
-                
+        details = {
+            k: "*****" if _is_secret_key(k) else v
+            for k, v in kwargs.items()
+        }
+        record = (time.time(), event_type, details)
+        if self._sync:
+            with self._lock:
+                self._write([record])
+            return
+            
+        self._ensure_worker()
+        self._queue.put_nowait(record)
+
+    def flush(self, timeout: float = 2.0) -> None:
+        """Block until every event queued so far has been written."""
+        if self._worker is None or not self._worker.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put_nowait(done)
+        done.wait(timeout)
+
+    def close(self) -> None:
+        """Drain the queue, stop the writer thread and release the log file handle."""
+        worker = self._worker
+        if worker is not None and worker.is_alive():
+            self._queue.put_nowait(_STOP)
+            worker.join(2.0)
+        with self._lock:
+            if self._fh is not None:
+                try:
+                    self._fh.close()
+                except Exception:
+                    pass
+                self._fh = None
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._drain, name="termbackup-audit", daemon=True
+                )
+                self._worker.start()
+
+    def _drain(self) -> None:
+        while True:
+            item = self._queue.get()
+            records: List[Tuple[float, str, Dict[str, Any]]] = []
+            waiters: List[threading.Event] = []
+            stop = False
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    records.append(item)
+                if stop or len(records) >= BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                    
+            with self._lock:
+                self._write(records)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+    def _write(self, records: List[Tuple[float, str, Dict[str, Any]]]) -> None:
+        if not records:
+            return
+        lines = []
+        for ts, event_type, details in records:
+            entry: Dict[str, Any] = {
+                "timestamp": _format_timestamp(ts),
+                "event": event_type,
+                "details": details
+            }
+            try:
+                lines.append(_dumps_line(entry))
+            except Exception as e:
+                self._report_failure(e, [])
+        data = b"".join(lines)
         try:
-            with self.log_file.open("a", encoding="utf-8") as f:
-                f.write(json.dumps(entry) + "\n")
+            if self._fh is None:
+                self._fh = self.log_file.open("ab", buffering=64 * 1024)
+            self._fh.write(data)
+            self._fh.flush()
         except Exception as e:
-            try:
-                import sys
-                sys.stderr.write(f"[TermBackup Audit Error] Failed to write log: {e}\n")
-                fallback = get_config_dir() / "audit_fallback.log"
-                with fallback.open("a", encoding="utf-8") as f:
-                    f.write(json.dumps(entry) + "\n")
-            except Exception:
-                pass
+            self._report_failure(e, lines)
+
+    def _report_failure(self, error: Exception, lines: List[bytes]) -> None:
+        try:
+            import sys
+            sys.stderr.write(f"[TermBackup Audit Error] Failed to write log: {error}\n")
+            with _fallback_path().open("ab") as f:
+                f.write(b"".join(lines))
+        except Exception:
+            pass
+
+_LOGGER: Optional[AuditLogger] = None
+_LOGGER_LOCK = threading.Lock()
+
+def get_audit_logger() -> AuditLogger:
+    """Return the process-wide audit logger, creating it on first use."""
+    global _LOGGER
+    if _LOGGER is None:
+        with _LOGGER_LOCK:
+            if _LOGGER is None:
+                _LOGGER = AuditLogger()
+    return _LOGGER
+
+def _tail_lines(path: Path, last_n: int) -> List[bytes]:
+    """Read the last N non-empty lines of a file by scanning blocks backwards from EOF."""
+    with path.open("rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= last_n:
+            read_len = min(TAIL_BLOCK_SIZE, pos)
+            pos -= read_len
+            f.seek(pos)
+            buf = f.read(read_len) + buf
+    lines = [line for line in buf.splitlines() if line.strip()]
+    if pos > 0:
+        # The first line may have been cut mid-way by the block boundary.
+        lines = lines[1:]
+    return lines[-last_n:] if last_n > 0 else []
+
+# (size, mtime_ns, last_n) of the last read, and the events it produced.
+_TAIL_CACHE: Dict[Path, Tuple[Tuple[int, int, int], List[Dict[str, Any]]]] = {}
 
 def get_audit_log(last_n: int = 50) -> list[Dict[str, Any]]:
     """Retrieve the last N events from the audit log."""
-    log_file = get_config_dir() / "audit.jsonl"
-    if not log_file.exists():
+    if _LOGGER is not None:
+        _LOGGER.flush()
+    log_file = _audit_path()
+    try:
+        st = log_file.stat()
+    except OSError:
         return []
         
-    lines = []
+    cache_key = (st.st_size, st.st_mtime_ns, last_n)
+    cached = _TAIL_CACHE.get(log_file)
+    if cached is not None and cached[0] == cache_key:
+        return list(cached[1])
+        
     try:
-        with log_file.open("r", encoding="utf-8") as f:
-            lines = f.readlines()
-            
-        parsed = []
-        for line in lines[-last_n:]:
-            if line.strip():
-                parsed.append(json.loads(line))
-        return parsed
+        parsed = [_loads(line) for line in _tail_lines(log_file, last_n)]
     except Exception:
         return []
+    _TAIL_CACHE[log_file] = (cache_key, parsed)
+    return list(parsed)
@@ -1,52 +1,60 @@
 """
 Command Line Interface entry point using Typer.
 """
-import asyncio
-import base64
+import json
 import os
-from datetime import datetime, timezone
+import sys
+import tempfile
+from binascii import b2a_base64
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple, Union
 
 import typer
-from rich.panel import Panel
-
-from .config import get_config_dir, load_profile, list_profiles, save_profile, get_profile_token
-from .crypto import (
-    derive_key,
-    derive_recovery_key,
-    encrypt,
-    generate_recovery_phrase,
-    generate_salt,
-    generate_signing_keypair,
-)
-from .models import Profile
+
 from .ui import (
     confirm,
     console,
     render_banner,
+    render_diff,
     render_error,
     render_progress,
     render_status,
     render_table,
-    render_tree,
     render_warning,
 )
 
+RICH_HELP = (
+    "[bold cyan]TERMBACKUP[/] [dim]v2.0[/]\n\n"
+    "⚡ [bold magenta]The Nexus Zero-Trust Matrix Engine[/]\n"
+    "A next-generation, professionally hardened, cryptographic vault for your terminal.\n\n"
+    "> [italic]Encrypt Reality. Trust Nothing.[/]\n"
+)
+PLAIN_HELP = (
+    "TERMBACKUP v2.0 - The Nexus Zero-Trust Matrix Engine.\n\n"
+    "A next-generation, professionally hardened, cryptographic vault for your terminal."
+)
+
+def _is_interactive() -> bool:
+    """False for piped output and shell completion, where Rich markup is wasted work."""
+    return sys.stdout.isatty() and "_TERMBACKUP_COMPLETE" not in os.environ
+
+_INTERACTIVE = _is_interactive()
+
 app = typer.Typer(
-    help=(
-        "[bold cyan]TERMBACKUP[/] [dim]v2.0[/]\n\n"
-        "⚡ [bold magenta]The Nexus Zero-Trust Matrix Engine[/]\n"
-        "A next-generation, professionally hardened, cryptographic vault for your terminal.\n\n"
-        "> [italic]Encrypt Reality. Trust Nothing.[/]\n"
-    ),
+    help=RICH_HELP if _INTERACTIVE else PLAIN_HELP,
     no_args_is_help=True,
-    rich_markup_mode="rich"
+    rich_markup_mode="rich" if _INTERACTIVE else None
 )
 
-def run_async(coro):
-    """Helper to run async code inside Typer sync commands."""
-    return asyncio.run(coro)
+STATUS_LABELS = {
+    "pass": "[bold green]PASS[/]",
+    "warn": "[bold yellow]WARN[/]",
+    "fail": "[bold red]FAIL[/]",
+}
+
+def _b64(data: bytes) -> str:
+    """Encode bytes as the base64 text stored in profile JSON."""
+    return b2a_base64(data, newline=False).decode("ascii")
 
 @app.command(name="init")
 def init(
@@ -60,15 +68,53 @@ def init(
     Initialize a new backup profile.
     Generates Master DEK, Recovery Phrase, and Ed25519 signing keys.
     """
+    import asyncio
+    from datetime import datetime, timezone
+
+    from rich.panel import Panel
+
+    from .config import save_profile
+    from .crypto import (
+        KEY_LEN,
+        NONCE_LEN,
+        RECOVERY_KDF,
+        SALT_LEN,
+        derive_key,
+        derive_recovery_key,
+        encrypt_many,
+        generate_recovery_phrase,
+        generate_signing_keypair,
+    )
+    from .github import GitHubClient, TokenValidationResult
+    from .models import Profile
+
     render_banner()
     render_status("info", "Initialize new TermBackup zero-trust profile...")
     
-    # 1. Validate Token First
-    from .github import GitHubClient
+    # 1. Master Key Architecture
+    # Master Data Encryption Key (DEK) encrypts everything else.
+    # The DEK, both KDF salts and the three wrapping nonces come from a single entropy draw.
+    entropy = os.urandom(KEY_LEN + 2 * SALT_LEN + 3 * NONCE_LEN)
+    master_dek = entropy[:KEY_LEN]
+    pwd_salt = entropy[KEY_LEN:KEY_LEN + SALT_LEN]
+    rec_salt = entropy[KEY_LEN + SALT_LEN:KEY_LEN + 2 * SALT_LEN]
+    wrap_nonces = entropy[KEY_LEN + 2 * SALT_LEN:]
+    phrase = generate_recovery_phrase()
+    
     client = GitHubClient(token)
     
-    with console.status("[cyan]Validating GitHub token scopes..."):
-        validation = client.validate_token()
+    async def _prepare() -> Tuple[TokenValidationResult, bytes, bytes]:
+        # Token validation is network-bound and both Argon2 derivations release
+        # the GIL, so all three run side by side instead of back to back.
+        return await asyncio.gather(
+            asyncio.to_thread(client.validate_token),
+            asyncio.to_thread(derive_key, password, pwd_salt),
+            asyncio.to_thread(derive_recovery_key, phrase, rec_salt, RECOVERY_KDF),
+        )
+    
+    # 2. Validate Token while deriving the key-encryption keys
+    with client, console.status("[cyan]Validating GitHub token and deriving keys..."):
+        validation, pwd_kek, rec_kek = asyncio.run(_prepare())
         
     if not validation.is_valid:
         render_error(validation.message)
@@ -80,27 +126,17 @@ def init(
         if not confirm("Proceed despite token warnings?"):
             raise typer.Exit(0)
             
-    # 2. Master Key Architecture
-    # Master Data Encryption Key (DEK) encrypts everything else.
-    master_dek = os.urandom(32)
-    
-    # Encrypt DEK with user password
-    pwd_salt = generate_salt()
-    pwd_kek = derive_key(password, pwd_salt)
-    master_key_enc = encrypt(master_dek, pwd_kek)
-    
-    # Encrypt DEK with Recovery Phrase
-    phrase = generate_recovery_phrase()
-    rec_salt = generate_salt()
-    rec_kek = derive_recovery_key(phrase, rec_salt)
-    recovery_key_enc = encrypt(master_dek, rec_kek)
-    
     # Generate Ed25519 signing keypair
     priv, pub = generate_signing_keypair()
-    pub_b64 = base64.b64encode(pub).decode("ascii")
-    # Store private key encrypted by DEK
-    priv_enc = encrypt(priv, master_dek)
-    priv_enc_b64 = base64.b64encode(priv_enc).decode("ascii")
+    pub_b64 = _b64(pub)
+    
+    # Encrypt DEK with user password and Recovery Phrase; private key with the DEK
+    master_key_enc, recovery_key_enc, priv_enc = encrypt_many([
+        (master_dek, pwd_kek),
+        (master_dek, rec_kek),
+        (priv, master_dek),
+    ], nonces=wrap_nonces)
+    priv_enc_b64 = _b64(priv_enc)
     
     profile = Profile(
         name=name,
@@ -108,10 +144,11 @@ def init(
         repo=repo,
         token_ref=f"termbackup_{name}_token",
         created_at=datetime.now(timezone.utc),
-        master_key_enc=base64.b64encode(master_key_enc).decode("ascii"),
-        master_key_salt=base64.b64encode(pwd_salt).decode("ascii"),
-        recovery_key_enc=base64.b64encode(recovery_key_enc).decode("ascii"),
-        recovery_key_salt=base64.b64encode(rec_salt).decode("ascii"),
+        master_key_enc=_b64(master_key_enc),
+        master_key_salt=_b64(pwd_salt),
+        recovery_key_enc=_b64(recovery_key_enc),
+        recovery_key_salt=_b64(rec_salt),
+        recovery_kdf=RECOVERY_KDF,
         signing_public_key=pub_b64,
         signing_private_key_enc=priv_enc_b64
     )
@@ -126,11 +163,6 @@ def init(
     
     confirm("I have written down the 24-word recovery phrase securely. Continue?")
 
-from .github import GitHubClient
-from .manifest import create_initial_manifest
-from .snapshot import create_snapshot
-from .restore import preview_tree, restore_snapshot, diff_snapshot
-
 @app.command(name="snapshot")
 def create_snapshot_cmd(
     name: str = typer.Argument(..., help="Profile to snapshot"),
@@ -139,6 +171,16 @@ def create_snapshot_cmd(
     """
     Create a new zero-trust snapshot and upload it.
     """
+    import asyncio
+    from datetime import datetime, timezone
+
+    from .config import get_manifest_cache_path, get_profile_token, load_profile
+    from .crypto import compute_sha256_path
+    from .github import GitHubClient
+    from .manifest import append_entry, create_initial_manifest
+    from .models import ManifestEntry, SnapshotMeta
+    from .snapshot import create_snapshot
+
     render_banner()
     try:
         profile = load_profile(name)
@@ -150,36 +192,45 @@ def create_snapshot_cmd(
             
         client = GitHubClient(token)
         
-        with render_progress("Creating zero-trust snapshot...") as progress:
-            tbk_path, meta = create_snapshot(profile, password)
-            
-        render_status("encrypt", f"Snapshot {meta.snapshot_id} created and encrypted locally.")
-        
-        with render_progress("Uploading to GitHub..."):
-            # Update manifest
-            manifest = client.download_manifest(profile.repo)
-            if not manifest:
-                manifest = create_initial_manifest()
-            
-            # Read tbk
-            content = tbk_path.read_bytes()
+        async def _pipeline() -> Tuple[Path, SnapshotMeta]:
+            # The manifest fetch is pure network latency; overlap it with local encryption.
+            with render_progress("Creating zero-trust snapshot..."):
+                manifest, (tbk_path, meta) = await asyncio.gather(
+                    asyncio.to_thread(
+                        client.download_manifest,
+                        profile.repo,
+                        get_manifest_cache_path(profile.name),
+                    ),
+                    asyncio.to_thread(create_snapshot, profile, password),
+                )
+                
+            render_status("encrypt", f"Snapshot {meta.snapshot_id} created and encrypted locally.")
             
-            # Upload snapshot
-            client.upload_file(profile.repo, f"snapshots/{tbk_path.name}", content, f"Add snapshot {meta.snapshot_id}")
+            with render_progress("Uploading to GitHub..."):
+                if not manifest:
+                    manifest = create_initial_manifest()
+                
+                entry = ManifestEntry(
+                    snapshot_id=meta.snapshot_id,
+                    filename=tbk_path.name,
+                    sha256=meta.sha256 or compute_sha256_path(tbk_path),
+                    size=meta.total_size,
+                    uploaded_at=datetime.now(timezone.utc)
+                )
+                manifest = append_entry(manifest, entry)
+                
+                # Snapshot streams up raw as a release asset; the manifest follows in one commit
+                await asyncio.to_thread(
+                    client.publish_snapshot,
+                    profile.repo,
+                    tbk_path,
+                    manifest,
+                    f"Add snapshot {meta.snapshot_id}",
+                )
+            return tbk_path, meta
             
-            # Update manifest
-            from .manifest import append_entry
-            from .models import ManifestEntry
-            from .crypto import compute_sha256
-            entry = ManifestEntry(
-                snapshot_id=meta.snapshot_id,
-                filename=tbk_path.name,
-                sha256=compute_sha256(content),
-                size=meta.total_size,
-                uploaded_at=datetime.now(timezone.utc)
-            )
-            manifest = append_entry(manifest, entry)
-            client.upload_manifest(profile.repo, manifest)
+        with client:
+            tbk_path, meta = asyncio.run(_pipeline())
             
         tbk_path.unlink()  # Cleanup local
         render_status("success", f"Snapshot {meta.snapshot_id} securely uploaded to {profile.repo}.")
@@ -197,35 +248,62 @@ def run_restore(
     overwrite: bool = typer.Option(False, "--overwrite", help="Overwrite existing files")
 ):
     """Restore a snapshot to a target directory."""
+    import asyncio
+
+    from .config import get_manifest_cache_path, get_profile_token, load_profile
+    from .github import GitHubClient
+    from .restore import restore_snapshot
+    from .snapshot import get_master_dek
+
     render_banner()
-    from pathlib import Path
     try:
         profile = load_profile(name)
         token = get_profile_token(profile)
-        client = GitHubClient(token)
-        
         target_dir = Path(target).resolve()
         
-        with render_progress(f"Downloading snapshot {snapshot_id}..."):
-            manifest = client.download_manifest(profile.repo)
-            if not manifest:
-                raise Exception("Manifest not found on GitHub. Cannot find snapshot.")
+        # Unpredictable, owner-only (0600) scratch file instead of a fixed name in the
+        # shared temp dir
+        fd, temp_name = tempfile.mkstemp(prefix="tbk_", suffix=".tbk")
+        os.close(fd)
+        temp_tbk = Path(temp_name)
+        
+        async def _fetch() -> None:
+            # The Argon2id unlock is CPU-bound and independent of the network, so it runs
+            # alongside the downloads; restore_snapshot then reuses the memoized key.
+            unlock = asyncio.create_task(asyncio.to_thread(get_master_dek, profile, password))
             
-            # Find entry
-            entry = next((e for e in manifest.entries if e.snapshot_id == snapshot_id), None)
-            if not entry:
-                raise Exception(f"Snapshot {snapshot_id} not found in manifest.")
+            with render_progress("Fetching manifest..."):
+                manifest = await asyncio.to_thread(
+                    client.download_manifest, profile.repo, get_manifest_cache_path(profile.name)
+                )
+                if not manifest:
+                    raise Exception("Manifest not found on GitHub. Cannot find snapshot.")
                 
-            content = client.download_file(profile.repo, f"snapshots/{entry.filename}")
-            
-            import tempfile
-            temp_tbk = Path(tempfile.gettempdir()) / entry.filename
-            temp_tbk.write_bytes(content)
-            
-        with render_progress("Decrypting and extracting..."):
-            restore_snapshot(temp_tbk, profile, password, target_dir, overwrite=overwrite)
+                # Find entry
+                entry = manifest.by_id().get(snapshot_id)
+                if not entry:
+                    raise Exception(f"Snapshot {snapshot_id} not found in manifest.")
+                    
+            with render_progress(f"Downloading snapshot {snapshot_id}..."):
+                await asyncio.gather(
+                    asyncio.to_thread(
+                        client.download_snapshot,
+                        profile.repo,
+                        entry.filename,
+                        temp_tbk,
+                    ),
+                    unlock,
+                )
+                
+        try:
+            with GitHubClient(token) as client:
+                asyncio.run(_fetch())
+                
+            with render_progress("Decrypting and extracting..."):
+                restore_snapshot(temp_tbk, profile, password, target_dir, overwrite=overwrite)
+        finally:
+            temp_tbk.unlink(missing_ok=True)
             
-        temp_tbk.unlink()
         render_status("success", f"Successfully restored to {target_dir}")
         
     except Exception as e:
@@ -240,11 +318,8 @@ def run_doctor():
     with render_progress("Running diagnostic checks..."):
         results = run_diagnostics()
         
-    rows = []
-    for r in results:
-        status_text = "[bold green]PASS[/]" if r.status == "pass" else "[bold yellow]WARN[/]" if r.status == "warn" else "[bold red]FAIL[/]"
-        rows.append([status_text, r.name, r.detail])
-        
+    rows = [[STATUS_LABELS.get(r.status, STATUS_LABELS["fail"]), r.name, r.detail] for r in results]
+
     render_table("Nexus Doctor Diagnostics", ["Status", "Check", "Details"], rows)
 
 @app.command(name="daemon")
@@ -254,8 +329,9 @@ def run_daemon(
     generate: bool = typer.Option(False, "--generate", help="Just generate service file instead of running")
 ):
     """Ghost Protocol: Run background backups."""
+    from rich.panel import Panel
+
     from .daemon import DaemonProcess, generate_systemd_unit, generate_windows_task_xml
-    import sys
     
     if generate:
         if sys.platform == "win32":
@@ -278,6 +354,9 @@ def run_daemon(
 @app.command(name="list")
 def list_snapshots_cmd(name: str = typer.Argument(..., help="Profile to list snapshots for")):
     """List snapshots available on GitHub."""
+    from .config import get_manifest_cache_path, get_profile_token, load_profile
+    from .github import GitHubClient
+
     render_banner()
     try:
         profile = load_profile(name)
@@ -285,16 +364,17 @@ def list_snapshots_cmd(name: str = typer.Argument(..., help="Profile to list sna
         client = GitHubClient(token)
         
         with render_progress("Fetching manifest..."):
-            manifest = client.download_manifest(profile.repo)
+            manifest = client.download_manifest(profile.repo, get_manifest_cache_path(profile.name))
             
         if not manifest or not manifest.entries:
             render_status("info", "No snapshots found.")
             return
             
-        rows = []
-        for e in manifest.entries:
-            rows.append([e.snapshot_id, e.filename, f"{e.size} B", e.uploaded_at.strftime("%Y-%m-%d %H:%M:%S")])
-            
+        rows = [
+            [e.snapshot_id, e.filename, f"{e.size} B", e.uploaded_at.strftime("%Y-%m-%d %H:%M:%S")]
+            for e in manifest.entries
+        ]
+
         render_table(f"Snapshots for {name}", ["ID", "Filename", "Size", "Uploaded At"], rows)
         
     except Exception as e:
@@ -305,16 +385,13 @@ def list_snapshots_cmd(name: str = typer.Argument(..., help="Profile to list sna
 def show_audit(last_n: int = typer.Option(50, "--last", "-n", help="Number of recent events to show")):
     """Show recent audit logs."""
     render_banner()
-    from .audit import get_audit_log
+    from .audit import format_details, get_audit_log
     events = get_audit_log(last_n)
     if not events:
         render_status("info", "No audit events found.")
         return
         
-    rows = []
-    for e in events:
-        rows.append([e["timestamp"], e["event"], str(e["details"])])
-        
+    rows = ((e["timestamp"], e["event"], format_details(e["details"])) for e in events)
     render_table("Audit Log", ["Timestamp", "Event", "Details"], rows)
 
 @app.command(name="plugin")
@@ -334,19 +411,26 @@ def list_profiles_cmd(
     json_output: bool = typer.Option(False, "--json", help="Output in JSON format.")
 ):
     """List all configured Termbackup profiles."""
+    import asyncio
+
     from .config import list_profiles, load_profile
-    from .ui import console
-    import json
+    from .models import Profile
     
+    async def _load_all(names: list[str]) -> list[Profile | BaseException]:
+        # Profile reads are independent disk I/O + validation; load them concurrently.
+        return await asyncio.gather(
+            *(asyncio.to_thread(load_profile, n) for n in names), return_exceptions=True
+        )
+        
     profiles = list_profiles()
+    loaded = asyncio.run(_load_all(profiles)) if profiles else []
+    
     if json_output:
-        profiles_data = []
-        for p in profiles:
-            try:
-                prof = load_profile(p)
-                profiles_data.append({"name": prof.name, "repo": prof.repo, "source_dir": prof.source_dir})
-            except Exception:
-                pass
+        profiles_data = [
+            {"name": prof.name, "repo": prof.repo, "source_dir": prof.source_dir}
+            for prof in loaded
+            if not isinstance(prof, BaseException)
+        ]
         print(json.dumps(profiles_data, indent=2))
         return
 
@@ -354,17 +438,15 @@ def list_profiles_cmd(
         typer.echo("No profiles found.")
         return
         
-    from .ui import render_table
-    
     rows = []
-    for p in profiles:
-        try:
-            prof = load_profile(p)
-            rows.append([prof.name, prof.repo, prof.source_dir])
-        except Exception as e:
-            err_msg = str(e).split('\n')[0]
-            if len(err_msg) > 60: err_msg = err_msg[:57] + "..."
+    for p, prof in zip(profiles, loaded, strict=True):
+        if isinstance(prof, BaseException):
+            err_msg = str(prof).split('\n')[0]
+            if len(err_msg) > 60:
+                err_msg = err_msg[:57] + "..."
             rows.append([p, "[red]ERROR[/]", err_msg])
+        else:
+            rows.append([prof.name, prof.repo, prof.source_dir])
             
     render_table("Configured Profiles", ["Name", "Repository", "Source Directory"], rows)
 
@@ -375,7 +457,6 @@ def delete_profile_cmd(
 ):
     """Delete a profile and its securely stored token."""
     from .config import delete_profile
-    from .ui import render_status
     delete_profile(name)
     render_status("delete", f"Profile '{name}' deleted.")
 
@@ -383,8 +464,8 @@ def delete_profile_cmd(
 @app.command(name="version")
 def version_cmd():
     """Display Termbackup version information."""
-    from .ui import console
     from rich.panel import Panel
+
     v = "2.0.0"
     console.print(Panel(f"[bold cyan]TERMBACKUP[/] v{v}\n[dim]The Nexus Zero-Trust Matrix Engine[/]", border_style="cyan", expand=False))
 
@@ -396,12 +477,12 @@ def diff_cmd(
     snapshot_id: str = typer.Option(..., "--snapshot", "-s", help="Snapshot ID to compare against")
 ):
     """Compare a snapshot with the current filesystem."""
-    from .config import load_profile, get_profile_token
+    import asyncio
+
+    from .config import get_profile_token, load_profile
     from .github import GitHubClient
     from .restore import diff_snapshot
-    from .ui import render_progress, render_error, render_diff
-    import tempfile
-    from pathlib import Path
+    from .snapshot import get_master_dek
     
     profile = load_profile(profile_name)
     token = get_profile_token(profile)
@@ -409,19 +490,31 @@ def diff_cmd(
         render_error("Token not found. Please provide it via TERMBACKUP_TOKEN or re-init.")
         raise typer.Exit(1)
         
-    with GitHubClient(token) as client:
-        try:
-            with render_progress(f"Downloading snapshot {snapshot_id}...") as prog:
-                tbk_data = client.download_file(profile.repo, f"snapshots/{snapshot_id}.tbk")
-        except Exception as e:
-            render_error(f"Failed to download snapshot: {e}")
-            raise typer.Exit(1)
-            
     with tempfile.TemporaryDirectory() as td:
         tbk_path = Path(td) / f"{snapshot_id}.tbk"
-        tbk_path.write_bytes(tbk_data)
         
-        with render_progress("Computing cryptographic delta...") as prog:
+        async def _fetch() -> Tuple[Optional[BaseException], Union[bytes, BaseException]]:
+            # Overlap the Argon2id unlock with the download; diff_snapshot reuses the memoized key.
+            # return_exceptions keeps each failure attributable to its own step.
+            return await asyncio.gather(
+                asyncio.to_thread(
+                    client.download_snapshot, profile.repo, f"{snapshot_id}.tbk", tbk_path
+                ),
+                asyncio.to_thread(get_master_dek, profile, password),
+                return_exceptions=True,
+            )
+            
+        with GitHubClient(token) as client:
+            with render_progress(f"Downloading snapshot {snapshot_id}..."):
+                download_result, unlock_result = asyncio.run(_fetch())
+        if isinstance(unlock_result, BaseException):
+            render_error(f"Failed to unlock profile: {unlock_result}")
+            raise typer.Exit(1) from unlock_result
+        if isinstance(download_result, BaseException):
+            render_error(f"Failed to download snapshot: {download_result}")
+            raise typer.Exit(1) from download_result
+                
+        with render_progress("Computing cryptographic delta..."):
             delta = diff_snapshot(tbk_path, profile, password, Path(profile.source_dir))
             
     render_diff(delta)
@@ -433,9 +526,8 @@ def delete_snapshot_cmd(
     snapshot_id: str = typer.Argument(..., help="Snapshot ID to delete")
 ):
     """Delete a specific snapshot from the remote vault."""
-    from .config import load_profile, get_profile_token
+    from .config import get_profile_token, load_profile
     from .github import GitHubClient
-    from .ui import render_status, render_error, render_progress
     
     profile = load_profile(profile_name)
     token = get_profile_token(profile)
@@ -444,9 +536,11 @@ def delete_snapshot_cmd(
         raise typer.Exit(1)
         
     with GitHubClient(token) as client:
-        with render_progress(f"Annihilating snapshot {snapshot_id}...") as prog:
+        with render_progress(f"Annihilating snapshot {snapshot_id}..."):
             try:
-                client.delete_file(profile.repo, f"snapshots/{snapshot_id}.tbk", f"Delete snapshot {snapshot_id}")
+                client.delete_snapshot(
+                    profile.repo, f"{snapshot_id}.tbk", f"Delete snapshot {snapshot_id}"
+                )
             except Exception as e:
                 render_error(f"Deletion failed: {e}")
                 raise typer.Exit(1)
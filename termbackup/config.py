@@ -1,48 +1,59 @@
 """
 Configuration, profile management, and token storage for TermBackup.
 """
-import json
 import os
 import stat
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-import keyring
-
-from .crypto import decrypt, encrypt
 from .errors import ProfileNotFoundError, ProfileValidationError
 from .models import Profile
 
 APP_NAME = "termbackup"
 
+# Parsed profiles keyed by path, tagged with the stat stamp they were read at
+_PROFILE_CACHE: Dict[Path, Tuple[Tuple[int, int, int], Profile]] = {}
+
 def get_config_dir() -> Path:
     """Returns the platform-specific configuration directory."""
     if sys.platform == "win32":
-        appdata = os.getenv("APPDATA")
-        if appdata:
-            base_dir = Path(appdata)
-        else:
-            base_dir = Path.home() / "AppData" / "Roaming"
+        base_dir = os.getenv("APPDATA") or str(Path.home() / "AppData" / "Roaming")
     else:
         # XDG Base Directory specification
-        xdg_config = os.getenv("XDG_CONFIG_HOME")
-        if xdg_config:
-            base_dir = Path(xdg_config)
-        else:
-            base_dir = Path.home() / ".config"
-    
-    config_dir = base_dir / APP_NAME
+        base_dir = os.getenv("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    return _ensure_config_dir(base_dir)
+
+@cache
+def _ensure_config_dir(base_dir: str) -> Path:
+    """Create the config directory once per base path; later calls skip the mkdir."""
+    config_dir = Path(base_dir) / APP_NAME
     config_dir.mkdir(parents=True, exist_ok=True)
     return config_dir
 
+def get_manifest_cache_path(name: str) -> Path:
+    """Return the local manifest cache file for a profile."""
+    return get_config_dir() / "cache" / f"{name}.manifest.json"
+
+def get_fingerprint_cache_path() -> Path:
+    """Return the SQLite cache of file hashes shared by all scans."""
+    return get_config_dir() / "cache" / "fingerprints.sqlite"
+
 def list_profiles() -> List[str]:
     """List all available profile names."""
-    config_dir = get_config_dir()
-    profiles = []
-    for fp in config_dir.glob("*.json"):
-        if fp.is_file() and not fp.name.startswith(".") and fp.name != "config.json":
-            profiles.append(fp.stem)
+    # scandir reuses the d_type from the directory listing, avoiding a stat per entry
+    with os.scandir(get_config_dir()) as it:
+        profiles = [
+            entry.name[:-5]
+            for entry in it
+            if entry.name.endswith(".json")
+            and not entry.name.startswith(".")
+            and entry.name != "config.json"
+            and entry.is_file(follow_symlinks=False)
+        ]
     return sorted(profiles)
 
 def get_profile_path(name: str) -> Path:
@@ -55,61 +66,100 @@ def apply_secure_permissions(path: Path) -> None:
         # Owner read/write only
         path.chmod(stat.S_IRUSR | stat.S_IWUSR)
 
+def _dump_profile(profile: Profile) -> bytes:
+    """Serialize a profile to indented JSON bytes via pydantic-core."""
+    return profile.model_dump_json(indent=2).encode("utf-8")
+
+def _write_profile(profile: Profile) -> None:
+    """
+    Atomically write a profile file with owner-only permissions.
+    mkstemp creates the temp file as 0600, so the profile is never readable
+    at the default umask, and os.replace swaps it in whole.
+    """
+    path = get_profile_path(profile.name)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_dump_profile(profile))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
 def save_profile(profile: Profile, token: str) -> None:
     """Save a profile to disk and its token securely."""
     # Attempt to store token in the keyring.
     keyring_failed = False
     try:
+        import keyring
         keyring.set_password(APP_NAME, profile.token_ref, token)
     except Exception:
         keyring_failed = True
 
-    path = get_profile_path(profile.name)
-    
     # Fallback: if keyring fails, we can't secure the token using DEK because we don't have the password right now easily.
     # Actually, we shouldn't save it in plaintext. We'll raise a warning.
     # We will just write the profile JSON.
-    with path.open("w", encoding="utf-8") as f:
-        f.write(profile.model_dump_json(indent=2))
-    
-    apply_secure_permissions(path)
+    _write_profile(profile)
     
     if keyring_failed:
         from .ui import render_warning
         render_warning("Failed to store token securely in OS keyring. You may need to provide it via environment variable.")
 
 def load_profile(name: str) -> Profile:
-    """Load a profile by name from disk."""
+    """
+    Load a profile by name from disk.
+    Profiles are frozen, so a parsed instance is reused until the file's
+    inode, size or mtime changes.
+    """
     path = get_profile_path(name)
-    if not path.exists():
-        raise ProfileNotFoundError(f"Profile '{name}' does not exist.")
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        raise ProfileNotFoundError(f"Profile '{name}' does not exist.") from None
+    
+    stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+    cached = _PROFILE_CACHE.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
     
     try:
-        with path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-            return Profile(**data)
+        # Parse and validate in one pass inside pydantic-core
+        profile = Profile.model_validate_json(path.read_bytes())
     except Exception as e:
         raise ProfileValidationError(f"Failed to load profile '{name}': {e}") from e
+    _PROFILE_CACHE[path] = (stamp, profile)
+    return profile
 
 def update_profile(profile: Profile) -> None:
     """Update an existing profile without touching the token."""
-    path = get_profile_path(profile.name)
-    with path.open("w", encoding="utf-8") as f:
-        f.write(profile.model_dump_json(indent=2))
-    apply_secure_permissions(path)
+    _write_profile(profile)
 
 def get_profile_token(profile: Profile) -> Optional[str]:
     """Retrieve the token for a given profile."""
     try:
+        import keyring
         return keyring.get_password(APP_NAME, profile.token_ref)
     except Exception:
         return None
 
+def get_tokens_bulk(profiles: Iterable[Profile]) -> Dict[str, Optional[str]]:
+    """
+    Retrieve tokens for many profiles at once, keyed by profile name.
+    Each keyring lookup is an IPC round trip, so they are issued concurrently.
+    """
+    profiles = list(profiles)
+    if not profiles:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(8, len(profiles))) as pool:
+        tokens = pool.map(get_profile_token, profiles)
+        return dict(zip((p.name for p in profiles), tokens, strict=True))
+
 def delete_profile(name: str) -> None:
     """Delete a profile and its associated token."""
     try:
         profile = load_profile(name)
         try:
+            import keyring
             keyring.delete_password(APP_NAME, profile.token_ref)
         except Exception:
             pass  # Maybe it wasn't there
@@ -117,5 +167,10 @@ def delete_profile(name: str) -> None:
         pass
     
     path = get_profile_path(name)
+    _PROFILE_CACHE.pop(path, None)
     if path.exists():
         path.unlink()
+        
+    cache_file = get_manifest_cache_path(name)
+    cache_file.unlink(missing_ok=True)
+    cache_file.with_suffix(".etag").unlink(missing_ok=True)
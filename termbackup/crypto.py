@@ -2,28 +2,57 @@
 Top-level crypto module owning all security-critical operations.
 Argon2id KDF, AES-256-GCM encryption/decryption, Ed25519 signatures, Recovery Phrase generation.
 """
+import atexit
 import hashlib
 import hmac
 import os
-from typing import Tuple
+import threading
+from collections import OrderedDict
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Sequence, Tuple, Union, cast
 
 from argon2.low_level import Type, hash_secret_raw
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from mnemonic import Mnemonic
 
 from .errors import DecryptionError, EncryptionError, KeyDerivationError, SignatureError
 
+if TYPE_CHECKING:
+    from mnemonic import Mnemonic
+
 SALT_LEN = 32
 NONCE_LEN = 12
 KEY_LEN = 32
+KEK_CACHE_SIZE = 8
+
+# Argon2id (time_cost, memory_cost KiB, parallelism)
+PASSWORD_KDF_PARAMS = (3, 65536, 4)  # 64 MiB
+# A 24-word phrase carries 256 bits of entropy, so brute force is infeasible
+# whatever the work factor; a lighter setting keeps recovery fast.
+RECOVERY_KDF_PARAMS = (1, 16384, 2)  # 16 MiB
+RECOVERY_KDF = "argon2id-t1-m16384-p2"
+
+_KEK_CACHE: "OrderedDict[Tuple[bytes, bytes, Tuple[int, int, int]], bytearray]" = OrderedDict()
+_KEK_CACHE_LOCK = threading.Lock()
+
+AEAD_CACHE_SIZE = 16
 
-def compute_sha256(data: bytes) -> str:
-    """Compute the SHA-256 hash of raw bytes."""
-    hasher = hashlib.sha256()
-    hasher.update(data)
-    return hasher.hexdigest()
+# AESGCM contexts and imported Ed25519 keys, keyed by (kind, BLAKE2b digest of
+# the key bytes) so raw keys are not kept as dict keys.
+_AEAD_CACHE: "OrderedDict[Tuple[str, bytes], Any]" = OrderedDict()
+_AEAD_CACHE_LOCK = threading.Lock()
+
+def compute_sha256(data: Union[bytes, bytearray, memoryview]) -> str:
+    """Compute the SHA-256 hash of raw bytes (or any buffer, e.g. an mmap slice)."""
+    return hashlib.sha256(data).hexdigest()
+
+def compute_sha256_path(path: Path) -> str:
+    """Stream a file through SHA-256 without buffering it whole (see utils.sha256_file)."""
+    from .utils import sha256_file
+
+    return sha256_file(path)
 
 def generate_salt() -> bytes:
     """Generate 32 bytes of secure random salt."""
@@ -37,29 +66,94 @@ def derive_key(password: str, salt: bytes) -> bytes:
     """
     Derive a 32-byte key using Argon2id.
     Parameters: 64 MiB memory, 3 iterations, 4 lanes.
+    Results are memoized in-process (see `clear_key_cache`) so repeated
+    unlocks with the same password and salt pay the KDF cost once.
     """
+    return _derive_argon2(password, salt, PASSWORD_KDF_PARAMS)
+
+def _derive_argon2(password: str, salt: bytes, params: Tuple[int, int, int]) -> bytes:
+    """Run (or recall) Argon2id with the given (time_cost, memory_cost, parallelism)."""
+    secret = password.encode("utf-8")
+    # The cache is keyed by a salted BLAKE2b digest, never the password itself.
+    cache_key = (hashlib.blake2b(secret, key=salt[:64], digest_size=32).digest(), salt, params)
+    with _KEK_CACHE_LOCK:
+        cached = _KEK_CACHE.get(cache_key)
+        if cached is not None:
+            _KEK_CACHE.move_to_end(cache_key)
+            return bytes(cached)
+            
+    time_cost, memory_cost, parallelism = params
     try:
         key = hash_secret_raw(
-            secret=password.encode("utf-8"),
+            secret=secret,
             salt=salt,
-            time_cost=3,
-            memory_cost=65536,  # 64 MiB
-            parallelism=4,
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
             hash_len=KEY_LEN,
             type=Type.ID
         )
-        return key
     except Exception as e:
         raise KeyDerivationError(f"Failed to derive key: {e}") from e
+        
+    with _KEK_CACHE_LOCK:
+        _KEK_CACHE[cache_key] = bytearray(key)
+        while len(_KEK_CACHE) > KEK_CACHE_SIZE:
+            _, evicted = _KEK_CACHE.popitem(last=False)
+            evicted[:] = bytes(len(evicted))
+    return key
+
+def clear_key_cache() -> None:
+    """Overwrite and drop every memoized key-encryption key and cached AES-GCM/Ed25519 context."""
+    with _KEK_CACHE_LOCK:
+        for kek in _KEK_CACHE.values():
+            kek[:] = bytes(len(kek))
+        _KEK_CACHE.clear()
+    with _AEAD_CACHE_LOCK:
+        _AEAD_CACHE.clear()
+
+atexit.register(clear_key_cache)
+
+@cache
+def _english_mnemo() -> "Mnemonic":
+    """Load the BIP-39 English wordlist once per process."""
+    from mnemonic import Mnemonic
+
+    return Mnemonic("english")
 
 def generate_recovery_phrase() -> str:
     """Generate a high-entropy 24-word recovery phrase."""
-    mnemo = Mnemonic("english")
-    return mnemo.generate(strength=256)
+    return _english_mnemo().generate(strength=256)
+
+def derive_recovery_key(phrase: str, salt: bytes, kdf: Optional[str] = RECOVERY_KDF) -> bytes:
+    """
+    Derives a key from the 24-word recovery phrase using Argon2id.
+    `kdf` is the identifier stored on the profile; None selects the password
+    KDF parameters that profiles created before RECOVERY_KDF used.
+    """
+    if kdf is None:
+        return derive_key(phrase, salt)
+    if kdf != RECOVERY_KDF:
+        raise KeyDerivationError(f"Unknown recovery KDF '{kdf}'.")
+    return _derive_argon2(phrase, salt, RECOVERY_KDF_PARAMS)
 
-def derive_recovery_key(phrase: str, salt: bytes) -> bytes:
-    """Derives a key from the 24-word recovery phrase using Argon2id."""
-    return derive_key(phrase, salt)
+def _cached_context(kind: str, key: bytes, factory: Callable[[bytes], Any]) -> Any:
+    """Return a cached key object built by `factory`, constructing it once per key."""
+    cache_key = (kind, hashlib.blake2b(key, digest_size=32).digest())
+    with _AEAD_CACHE_LOCK:
+        ctx = _AEAD_CACHE.get(cache_key)
+        if ctx is None:
+            ctx = factory(key)
+            _AEAD_CACHE[cache_key] = ctx
+            while len(_AEAD_CACHE) > AEAD_CACHE_SIZE:
+                _AEAD_CACHE.popitem(last=False)
+        else:
+            _AEAD_CACHE.move_to_end(cache_key)
+        return ctx
+
+def _aesgcm(key: bytes) -> AESGCM:
+    """Return a cached AESGCM context so the key schedule is set up once per key."""
+    return cast(AESGCM, _cached_context("aesgcm", key, AESGCM))
 
 def encrypt(data: bytes, key: bytes) -> bytes:
     """
@@ -69,13 +163,39 @@ def encrypt(data: bytes, key: bytes) -> bytes:
     if len(key) != KEY_LEN:
         raise EncryptionError("Invalid key length for AES-256-GCM.")
     try:
-        aesgcm = AESGCM(key)
+        aesgcm = _aesgcm(key)
         nonce = generate_nonce()
         ciphertext = aesgcm.encrypt(nonce, data, None)
         return nonce + ciphertext
     except Exception as e:
         raise EncryptionError(f"Encryption failed: {e}") from e
 
+def encrypt_many(
+    items: Sequence[Tuple[bytes, bytes]], nonces: Optional[bytes] = None
+) -> List[bytes]:
+    """
+    Encrypt several (data, key) pairs in one call.
+    Each distinct key gets one AESGCM context and all nonces come from a
+    single entropy draw; output order matches the input.
+    Callers that already hold fresh randomness may pass `nonces` as
+    len(items) * NONCE_LEN bytes straight from os.urandom. Never reuse them.
+    """
+    if any(len(key) != KEY_LEN for _, key in items):
+        raise EncryptionError("Invalid key length for AES-256-GCM.")
+    if nonces is None:
+        nonces = os.urandom(NONCE_LEN * len(items))
+    elif len(nonces) != NONCE_LEN * len(items):
+        raise EncryptionError("Nonce block does not match the number of items.")
+    try:
+        contexts = {key: _aesgcm(key) for key in {key for _, key in items}}
+        out = []
+        for i, (data, key) in enumerate(items):
+            nonce = nonces[i * NONCE_LEN:(i + 1) * NONCE_LEN]
+            out.append(nonce + contexts[key].encrypt(nonce, data, None))
+        return out
+    except Exception as e:
+        raise EncryptionError(f"Encryption failed: {e}") from e
+
 def decrypt(payload: bytes, key: bytes) -> bytes:
     """
     Decrypt data using AES-256-GCM.
@@ -89,7 +209,7 @@ def decrypt(payload: bytes, key: bytes) -> bytes:
     nonce = payload[:NONCE_LEN]
     ciphertext = payload[NONCE_LEN:]
     try:
-        aesgcm = AESGCM(key)
+        aesgcm = _aesgcm(key)
         plaintext = aesgcm.decrypt(nonce, ciphertext, None)
         return plaintext
     except Exception as e:
@@ -117,7 +237,12 @@ def generate_signing_keypair() -> Tuple[bytes, bytes]:
 def sign(data: bytes, private_key_raw: bytes) -> bytes:
     """Sign data using an Ed25519 private key (raw bytes)."""
     try:
-        priv_key = ed25519.Ed25519PrivateKey.from_private_bytes(private_key_raw)
+        priv_key = cast(
+            ed25519.Ed25519PrivateKey,
+            _cached_context(
+                "ed25519-sk", private_key_raw, ed25519.Ed25519PrivateKey.from_private_bytes
+            ),
+        )
         return priv_key.sign(data)
     except Exception as e:
         raise SignatureError(f"Signing failed: {e}") from e
@@ -125,7 +250,12 @@ def sign(data: bytes, private_key_raw: bytes) -> bytes:
 def verify(data: bytes, signature: bytes, public_key_raw: bytes) -> bool:
     """Verify an Ed25519 signature."""
     try:
-        pub_key = ed25519.Ed25519PublicKey.from_public_bytes(public_key_raw)
+        pub_key = cast(
+            ed25519.Ed25519PublicKey,
+            _cached_context(
+                "ed25519-pk", public_key_raw, ed25519.Ed25519PublicKey.from_public_bytes
+            ),
+        )
         pub_key.verify(signature, data)
         return True
     except Exception:
@@ -134,3 +264,12 @@ def verify(data: bytes, signature: bytes, public_key_raw: bytes) -> bool:
 def secure_compare(a: bytes, b: bytes) -> bool:
     """Constant-time comparison to prevent timing attacks."""
     return hmac.compare_digest(a, b)
+
+def secure_compare_hex(a: str, b: str) -> bool:
+    """Constant-time comparison of two hex digests, done on their raw bytes."""
+    if len(a) != len(b):
+        return False
+    try:
+        return hmac.compare_digest(bytes.fromhex(a), bytes.fromhex(b))
+    except ValueError:
+        return False
@@ -2,89 +2,191 @@
 Ghost Protocol: Background scheduler and systemd/schtasks integration for TermBackup.
 """
 import os
+import select
 import sys
-import time
-
-from apscheduler.schedulers.background import BackgroundScheduler  # type: ignore
+import threading
+from typing import TYPE_CHECKING, Optional
 
 from .config import get_config_dir
 from .utils import setup_signal_handlers
 
+if TYPE_CHECKING:
+    from apscheduler.schedulers.background import BackgroundScheduler  # type: ignore
+
+    from .github import GitHubClient
+
+WIN32_WAIT_SLICE = 5.0
+
+JOB_DEFAULTS = {"coalesce": True, "max_instances": 1, "misfire_grace_time": 300}
+
+_SYNCHRONIZE = 0x00100000
+_WAIT_TIMEOUT = 0x00000102
+
+
+def _try_lock(fd: int) -> bool:
+    """Try to take an exclusive, non-blocking lock on `fd`."""
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+def _unlock(fd: int) -> None:
+    """Release a lock taken with _try_lock."""
+    if sys.platform == "win32":
+        import msvcrt
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+def _scheduler() -> "BackgroundScheduler":
+    """Build the background scheduler, importing APScheduler only when a daemon starts."""
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    # Runs that start late (sleep, a long previous upload) still fire within five
+    # minutes, piled-up runs collapse into one, and a profile never uploads twice at once.
+    return BackgroundScheduler(job_defaults=JOB_DEFAULTS)
+
+def _pid_alive(pid: int) -> bool:
+    """
+    Return True if `pid` is a live (not exited) process.
+    Linux uses a pidfd, which becomes readable once the process exits and
+    cannot be fooled by PID reuse while held; Windows waits on the process
+    handle with a zero timeout. Other platforms fall back to kill(pid, 0).
+    """
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(_SYNCHRONIZE, 0, pid)
+        if not handle:
+            return False
+        try:
+            return kernel32.WaitForSingleObject(handle, 0) == _WAIT_TIMEOUT
+        finally:
+            kernel32.CloseHandle(handle)
+    
+    if hasattr(os, "pidfd_open"):
+        try:
+            fd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            pass  # Kernel without pidfd support (< 5.3); use the signal probe
+        else:
+            try:
+                readable, _, _ = select.select([fd], [], [], 0)
+                return not readable
+            finally:
+                os.close(fd)
+    
+    os.kill(pid, 0)
+    return True
+
 
 class DaemonProcess:
     def __init__(self, profile_name: str, interval_minutes: int):
         self.profile = profile_name
         self.interval = interval_minutes
-        self.scheduler = BackgroundScheduler()
+        # Created in start(); --generate never needs APScheduler
+        self.scheduler: Optional["BackgroundScheduler"] = None
         self.pid_file = get_config_dir() / f"daemon_{profile_name}.pid"
+        self.lock_file = self.pid_file.with_suffix(".lock")
+        self._lock_fd: Optional[int] = None
+        self._stop_event = threading.Event()
+        self._client: Optional["GitHubClient"] = None
+
+    def _github(self, token: str) -> "GitHubClient":
+        """Return the GitHub client kept across scheduled runs, rebuilt if the token changes."""
+        if self._client is None or self._client.token != token:
+            from .github import GitHubClient
+            if self._client is not None:
+                self._client.close()
+            self._client = GitHubClient(token)
+        return self._client
 
     def is_running(self) -> bool:
-        """Check if daemon is already running via PID file."""
+        """
+        Check if daemon is already running.
+        A running daemon holds an exclusive lock on its lock file for its whole
+        lifetime, which is decisive; the PID file covers daemons without one.
+        """
+        if self._lock_fd is not None:
+            return True
+        if self.lock_file.exists():
+            fd = os.open(self.lock_file, os.O_RDWR)
+            try:
+                if not _try_lock(fd):
+                    return True
+                _unlock(fd)
+            finally:
+                os.close(fd)
+            # Nobody holds the lock: any PID file left behind is stale
+            self.pid_file.unlink(missing_ok=True)
+            return False
         if not self.pid_file.exists():
             return False
         try:
             pid = int(self.pid_file.read_text())
-            # Cross-platform basic check
-            if sys.platform == "win32":
-                import ctypes
-                kernel32 = ctypes.windll.kernel32
-                process = kernel32.OpenProcess(0x1000, 0, pid)
-                if process:
-                    kernel32.CloseHandle(process)
-                    return True
-                return False
-            else:
-                os.kill(pid, 0)
+            if _pid_alive(pid):
                 return True
         except Exception:
-            self.pid_file.unlink(missing_ok=True)
-            return False
+            pass
+        self.pid_file.unlink(missing_ok=True)
+        return False
 
     def job(self) -> None:
         """The actual backup job."""
-        from .audit import AuditLogger
-        logger = AuditLogger()
+        from .audit import get_audit_logger
+        logger = get_audit_logger()
         logger.log("daemon_job_start", profile=self.profile)
         try:
             password = os.environ.get("TERMBACKUP_PASSWORD")
             if not password:
                 raise ValueError("TERMBACKUP_PASSWORD environment variable not set. Ghost Protocol cannot decrypt DEK.")
                 
-            from .config import load_profile, get_profile_token
-            from .snapshot import create_snapshot
-            from .github import GitHubClient
             from datetime import datetime, timezone
+
+            from .config import get_manifest_cache_path, get_profile_token, load_profile
+            from .snapshot import create_snapshot
             
             profile = load_profile(self.profile)
             token = get_profile_token(profile)
             if not token:
                 raise ValueError("Token not found in keyring.")
                 
-            with GitHubClient(token) as client:
-                tbk_path, meta = create_snapshot(profile, password)
-                content = tbk_path.read_bytes()
-                
-                manifest = client.download_manifest(profile.repo)
-                if not manifest:
-                    from .manifest import create_initial_manifest
-                    manifest = create_initial_manifest()
-                    
-                client.upload_file(profile.repo, f"snapshots/{tbk_path.name}", content, f"Ghost Protocol Auto-backup {meta.snapshot_id}")
-                
-                from .manifest import append_entry
-                from .models import ManifestEntry
-                from .crypto import compute_sha256
-                
-                entry = ManifestEntry(
-                    snapshot_id=meta.snapshot_id,
-                    filename=tbk_path.name,
-                    sha256=compute_sha256(content),
-                    size=meta.total_size,
-                    uploaded_at=datetime.now(timezone.utc)
-                )
-                manifest = append_entry(manifest, entry)
-                client.upload_manifest(profile.repo, manifest)
+            client = self._github(token)
+            tbk_path, meta = create_snapshot(profile, password)
+            
+            manifest = client.download_manifest(profile.repo, get_manifest_cache_path(profile.name))
+            if not manifest:
+                from .manifest import create_initial_manifest
+                manifest = create_initial_manifest()
                 
+            from .crypto import compute_sha256_path
+            from .manifest import append_entry
+            from .models import ManifestEntry
+            
+            entry = ManifestEntry(
+                snapshot_id=meta.snapshot_id,
+                filename=tbk_path.name,
+                # create_snapshot hashes the container as it writes it; no second pass over the file
+                sha256=meta.sha256 or compute_sha256_path(tbk_path),
+                size=meta.total_size,
+                uploaded_at=datetime.now(timezone.utc)
+            )
+            manifest = append_entry(manifest, entry)
+            
+            client.publish_snapshot(
+                profile.repo, tbk_path, manifest, f"Ghost Protocol Auto-backup {meta.snapshot_id}"
+            )
+            
             tbk_path.unlink(missing_ok=True)
             logger.log("daemon_job_end", profile=self.profile, status="success", snapshot_id=meta.snapshot_id)
         except Exception as e:
@@ -93,24 +195,46 @@ class DaemonProcess:
     def start(self) -> None:
         if self.is_running():
             raise RuntimeError(f"Daemon for profile '{self.profile}' is already running.")
-            
-        self.pid_file.write_text(str(os.getpid()))
         
+        # Take the lifetime lock first so two racing starts cannot both proceed
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o600)
+        if not _try_lock(fd):
+            os.close(fd)
+            raise RuntimeError(f"Daemon for profile '{self.profile}' is already running.")
+        self._lock_fd = fd
+        
+        # Write-then-rename so is_running never reads a half-written PID
+        tmp = self.pid_file.with_suffix(".pid.tmp")
+        tmp.write_text(f"{os.getpid()}\n")
+        os.replace(tmp, self.pid_file)
+        
+        self.scheduler = _scheduler()
         self.scheduler.add_job(self.job, 'interval', minutes=self.interval)
         self.scheduler.start()
         
         setup_signal_handlers(self.stop)
         
+        # Block until stop() (or a signal) ends the run instead of waking every second.
+        # Windows cannot interrupt an untimed lock wait with Ctrl+C, so it re-arms periodically.
+        timeout = WIN32_WAIT_SLICE if sys.platform == "win32" else None
         try:
-            while True:
-                time.sleep(1)
+            while not self._stop_event.wait(timeout):
+                pass
         except (KeyboardInterrupt, SystemExit):
             pass
 
     def stop(self) -> None:
-        if self.scheduler.running:
+        if self.scheduler and self.scheduler.running:
             self.scheduler.shutdown()
+        if self._client is not None:
+            self._client.close()
+            self._client = None
         self.pid_file.unlink(missing_ok=True)
+        if self._lock_fd is not None:
+            _unlock(self._lock_fd)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        self._stop_event.set()
 
 
 def generate_systemd_unit(profile_name: str, interval: int) -> str:
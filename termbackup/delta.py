@@ -3,79 +3,206 @@ Delta Engine: parallel hashing and sector-level delta detection.
 """
 import concurrent.futures
 import os
+import re
+import sqlite3
+from contextlib import closing
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
 
+from .config import get_fingerprint_cache_path
 from .models import DeltaResult, FileFingerprint
 from .utils import sha256_file
 
 # Extensions that are already compressed, we skip compression for these.
-COMPRESSED_EXTS: Set[str] = {
+COMPRESSED_EXTS: FrozenSet[str] = frozenset({
     ".zip", ".gz", ".xz", ".bz2", ".7z", ".rar", 
     ".jpg", ".jpeg", ".png", ".gif", ".webp", ".mp4", ".mkv", ".mp3"
-}
+})
 
-def scan_file(path: Path, base_dir: Path) -> FileFingerprint:
-    """Hash and stat a single file."""
-    stat = path.stat()
-    rel_path = path.relative_to(base_dir).as_posix()
+# Files hashed per executor task in scan_directory.
+SCAN_CHUNK_SIZE = 256
+
+# (st_dev, st_ino) -> ((st_size, st_mtime_ns, st_ctime_ns), sha256)
+HashCache = Dict[Tuple[int, int], Tuple[Tuple[int, int, int], str]]
+
+def scan_file(
+    path: Path,
+    base_dir: Path,
+    stat: Optional[os.stat_result] = None,
+    sha256: Optional[str] = None,
+    rel_path: Optional[str] = None,
+) -> FileFingerprint:
+    """
+    Hash and stat a single file. Pass `stat` when the caller already has it,
+    `sha256` when the content is known to be unchanged, and `rel_path` (POSIX,
+    relative to base_dir) when the walker has already built it.
+    """
+    if stat is None:
+        stat = path.stat()
+    if rel_path is None:
+        rel_path = path.relative_to(base_dir).as_posix()
     return FileFingerprint(
         relative_path=rel_path,
-        sha256=sha256_file(path),
+        sha256=sha256 or sha256_file(path),
         size=stat.st_size,
         mtime=stat.st_mtime
     )
 
-def scan_directory(source_dir: str | Path, exclude_patterns: List[str]) -> List[FileFingerprint]:
+def _scan_chunk(
+    entries: List[Tuple[os.DirEntry[str], str]],
+    base_dir: Path,
+    known: Optional[HashCache] = None,
+) -> Tuple[List[FileFingerprint], HashCache]:
+    """
+    Hash a batch of files sequentially inside one worker, skipping unreadable ones.
+    Files whose identity and stamp match `known` reuse the cached digest.
+    Returns the fingerprints and the cache entries for every file seen.
+    """
+    out: List[FileFingerprint] = []
+    seen: HashCache = {}
+    for entry, rel_path in entries:
+        try:
+            # DirEntry.stat() is the only stat per file (cached by the OS listing on Windows)
+            st = entry.stat()
+            # Windows DirEntry stats carry no inode, so the cache cannot be used there
+            key = (st.st_dev, st.st_ino) if st.st_ino else None
+            stamp = (st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+            hit = known.get(key) if known and key else None
+            cached = hit[1] if hit and hit[0] == stamp else None
+            fp = scan_file(Path(entry.path), base_dir, st, sha256=cached, rel_path=rel_path)
+            out.append(fp)
+            if key:
+                seen[key] = (stamp, fp.sha256)
+        except OSError:
+            # Vanished or unreadable mid-scan; anything else is a bug and should surface
+            continue
+    return out, seen
+
+def _load_hash_cache(db_path: Path, root: str) -> HashCache:
+    """Read the persisted hashes for one source root; any error just means a cold scan."""
+    if not db_path.exists():
+        return {}
+    try:
+        with closing(sqlite3.connect(db_path, timeout=5)) as db:
+            rows = db.execute(
+                "SELECT dev, ino, size, mtime_ns, ctime_ns, sha256 "
+                "FROM fingerprints WHERE root = ?",
+                (root,),
+            )
+            return {
+                (dev, ino): ((size, mtime_ns, ctime_ns), sha)
+                for dev, ino, size, mtime_ns, ctime_ns, sha in rows
+            }
+    except sqlite3.Error:
+        return {}
+
+def _store_hash_cache(db_path: Path, root: str, entries: HashCache) -> None:
+    """
+    Replace the stored hashes for one source root with the files seen in this
+    walk, so deleted files and abandoned trees don't accumulate. Best-effort.
+    """
+    try:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(db_path, timeout=5, isolation_level=None)) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            # Pre-root caches were one unscoped, never-pruned table
+            db.execute("DROP TABLE IF EXISTS fp")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints (root TEXT, dev INTEGER, ino INTEGER, "
+                "size INTEGER, mtime_ns INTEGER, ctime_ns INTEGER, sha256 TEXT, "
+                "PRIMARY KEY (root, dev, ino))"
+            )
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM fingerprints WHERE root = ?", (root,))
+            db.executemany(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((root, dev, ino, *stamp, sha) for (dev, ino), (stamp, sha) in entries.items()),
+            )
+            db.execute("COMMIT")
+    except sqlite3.Error:
+        pass
+
+def _iter_files(
+    base_dir: Path, exclude_patterns: List[str]
+) -> Iterator[Tuple[os.DirEntry[str], str]]:
+    """
+    Walk base_dir with os.scandir and yield (DirEntry, relative POSIX path) for included files.
+    Directory and file types come from the listing itself, so no stat is
+    issued here; symlinked directories are not followed.
+    """
+    # We use a simple exclusion logic based on substring matches for now,
+    # compiled into one alternation so each path is scanned once in C.
+    exclude_re = None
+    if exclude_patterns:
+        exclude_re = re.compile("|".join(map(re.escape, exclude_patterns)))
+    stack = [(str(base_dir), ".")]
+    while stack:
+        root, rel_root = stack.pop()
+        # Check exclusion on the relative root path. A match prunes the subtree,
+        # except at the top where "." only hides the files directly inside it.
+        root_excluded = bool(exclude_re and exclude_re.search(rel_root))
+        if root_excluded and rel_root != ".":
+            continue
+        prefix = "" if rel_root == "." else f"{rel_root}/"
+        try:
+            with os.scandir(root) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            rel_path = prefix + entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, rel_path))
+                    continue
+                if root_excluded or (exclude_re and exclude_re.search(rel_path)):
+                    continue
+                if entry.is_file():
+                    yield entry, rel_path
+            except OSError:
+                continue
+
+def scan_directory(
+    source_dir: str | Path, exclude_patterns: List[str], use_cache: bool = True
+) -> List[FileFingerprint]:
     """
     Scan a directory, parallel hashing all files.
+    With `use_cache`, files unchanged since a previous scan of the same root
+    (same device, inode, size, mtime_ns and ctime_ns) reuse their stored
+    SHA-256, and the cache is rewritten to this walk's files. Read-only
+    callers such as diff pass use_cache=False so they leave no cache behind.
     """
     base_dir = Path(source_dir).resolve()
     if not base_dir.is_dir():
         raise FileNotFoundError(f"Source directory not found: {source_dir}")
 
-    files_to_scan: List[Path] = []
-    
-    # We use a simple exclusion logic based on substring matches for now
-    for root, _, files in os.walk(base_dir):
-        root_path = Path(root)
-        # Check exclusion on the relative root path
-        rel_root = root_path.relative_to(base_dir).as_posix()
-        
-        skip_dir = False
-        for pattern in exclude_patterns:
-            if pattern in rel_root or f"/{pattern}/" in f"/{rel_root}/":
-                skip_dir = True
-                break
-        if skip_dir:
-            continue
-            
-        for f in files:
-            file_path = root_path / f
-            rel_file = file_path.relative_to(base_dir).as_posix()
-            
-            skip_file = False
-            for pattern in exclude_patterns:
-                if pattern in rel_file:
-                    skip_file = True
-                    break
-            
-            if not skip_file and file_path.is_file():
-                files_to_scan.append(file_path)
+    files_to_scan = list(_iter_files(base_dir, exclude_patterns))
 
+    db_path = get_fingerprint_cache_path() if use_cache else None
+    root = str(base_dir)
+    known = _load_hash_cache(db_path, root) if db_path else {}
     fingerprints: List[FileFingerprint] = []
+    seen: HashCache = {}
     
-    # Use ThreadPoolExecutor for parallel IO-bound hashing
+    # Use ThreadPoolExecutor for parallel hashing. hashlib drops the GIL while
+    # digesting each read, so threads already spread SHA-256 across cores on a
+    # warm cache; a process pool would only add pickling and startup cost.
+    # Files go out in batches so small-file trees don't pay a Future and queue
+    # hop per file.
     max_workers = min(32, (os.cpu_count() or 1) * 4)
+    chunks = [
+        files_to_scan[i:i + SCAN_CHUNK_SIZE]
+        for i in range(0, len(files_to_scan), SCAN_CHUNK_SIZE)
+    ]
     with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_path = {executor.submit(scan_file, p, base_dir): p for p in files_to_scan}
-        for future in concurrent.futures.as_completed(future_to_path):
-            try:
-                fp = future.result()
-                fingerprints.append(fp)
-            except Exception:
-                # Log or ignore files we can't read
-                pass
+        scan = partial(_scan_chunk, base_dir=base_dir, known=known)
+        for batch, batch_seen in executor.map(scan, chunks):
+            fingerprints.extend(batch)
+            seen.update(batch_seen)
+    if db_path:
+        _store_hash_cache(db_path, root, seen)
 
     # Sort for deterministic output
     fingerprints.sort(key=lambda x: x.relative_path)
@@ -89,26 +216,26 @@ def compute_delta(current: List[FileFingerprint], parent: Optional[List[FileFing
         return DeltaResult(added=current, modified=[], deleted=[], unchanged=[])
 
     parent_map: Dict[str, FileFingerprint] = {fp.relative_path: fp for fp in parent}
+    current_map: Dict[str, FileFingerprint] = {fp.relative_path: fp for fp in current}
+    
+    # Key-view set algebra runs in C; the comprehensions below only restore input order
+    new_paths = current_map.keys() - parent_map.keys()
+    gone_paths = parent_map.keys() - current_map.keys()
     
-    added: List[FileFingerprint] = []
+    added: List[FileFingerprint] = [fp for fp in current if fp.relative_path in new_paths]
     modified: List[FileFingerprint] = []
     unchanged: List[FileFingerprint] = []
-    
-    current_paths: Set[str] = set()
-
     for fp in current:
-        current_paths.add(fp.relative_path)
-        if fp.relative_path not in parent_map:
-            added.append(fp)
+        p_fp = parent_map.get(fp.relative_path)
+        if p_fp is None:
+            continue
+        if p_fp.sha256 != fp.sha256:
+            modified.append(fp)
         else:
-            p_fp = parent_map[fp.relative_path]
-            if p_fp.sha256 != fp.sha256:
-                modified.append(fp)
-            else:
-                unchanged.append(fp)
-
+            unchanged.append(fp)
+    
     deleted: List[FileFingerprint] = [
-        p_fp for p_path, p_fp in parent_map.items() if p_path not in current_paths
+        p_fp for p_path, p_fp in parent_map.items() if p_path in gone_paths
     ]
 
     return DeltaResult(
@@ -120,5 +247,7 @@ def compute_delta(current: List[FileFingerprint], parent: Optional[List[FileFing
     
 def should_compress(filename: str) -> bool:
     """Smart threshold: skip double-compression for media/archives."""
-    ext = Path(filename).suffix.lower()
-    return ext not in COMPRESSED_EXTS
+    # Plain string slicing; same result as Path(filename).suffix without building a path
+    name = filename[max(filename.rfind("/"), filename.rfind("\\")) + 1:]
+    i = name.rfind(".")
+    return i <= 0 or name[i:].lower() not in COMPRESSED_EXTS
@@ -1,163 +1,240 @@
 """
 12-Point Doctor Diagnostic Suite
 """
+import asyncio
+import hashlib
+import importlib.metadata
 import shutil
 import ssl
 import time
-from typing import List
+from typing import TYPE_CHECKING, List, Optional
 
 import httpx
 
-import importlib.metadata
-import shutil
-import ssl
-import time
-from typing import List
+from .config import get_config_dir, get_tokens_bulk, list_profiles, load_profile
+from .models import CheckStatus, DoctorCheck, Profile
 
-import httpx
+if TYPE_CHECKING:
+    from .github import GitHubClient
 
-from .config import get_config_dir, list_profiles, load_profile, get_profile_token
-from .github import GitHubClient
-from .models import DoctorCheck
+# Distribution names as listed in pyproject.toml, not import names
+CORE_DISTRIBUTIONS = (
+    "typer", "rich", "cryptography", "argon2-cffi", "httpx",
+    "keyring", "pydantic", "apscheduler", "mnemonic",
+)
 
 
 def run_diagnostics() -> List[DoctorCheck]:
-    """Execute the 12-point health checks synchronously."""
-    checks: List[DoctorCheck] = []
-    
+    """
+    Execute the 12-point health checks.
+    Independent groups of checks run concurrently on worker threads, so the
+    suite takes about as long as its slowest network probe.
+    """
     # 1. GitHub token scopes & 2. Rate limits 
     # (Requires a token, we parse the first valid profile or skip with warning)
     profiles = list_profiles()
-    client = None
-    if profiles:
+    prof: Optional[Profile] = None
+    token: Optional[str] = None
+    loaded = []
+    for p in profiles:
         try:
-            prof = load_profile(profiles[0])
-            from .config import get_profile_token
-            token = get_profile_token(prof)
-            if token:
-                client = GitHubClient(token)
+            loaded.append(load_profile(p))
         except Exception:
             pass
-            
-    if client:
-        try:
-            val = client.validate_token()
-            status = "pass" if val.is_valid and not val.needs_warning else "warn"
-            checks.append(DoctorCheck(name="1. GitHub Token Validation", status=status, detail=val.message or "Token valid and scoped correctly."))
-            
-            # Rate limit check roughly
+    if loaded:
+        tokens = get_tokens_bulk(loaded)
+        # Test against the first profile that actually has a stored token
+        prof, token = next(((p, tokens[p.name]) for p in loaded if tokens[p.name]), (None, None))
+        
+    # One client (and connection) serves the token, rate-limit and manifest checks
+    client = None
+    if token:
+        from .github import GitHubClient
+        client = GitHubClient(token)
+    
+    async def _gather() -> List[List[DoctorCheck]]:
+        return await asyncio.gather(
+            asyncio.to_thread(_check_github, client),
+            asyncio.to_thread(_check_latency),
+            asyncio.to_thread(_check_crypto),
+            asyncio.to_thread(_check_keyring),
+            asyncio.to_thread(_check_profiles, len(profiles), len(loaded)),
+            asyncio.to_thread(_check_config_dir),
+            asyncio.to_thread(_check_manifest, client, prof),
+            asyncio.to_thread(_check_engine),
+        )
+        
+    try:
+        groups = asyncio.run(_gather())
+    finally:
+        if client:
+            client.close()
+    return [check for group in groups for check in group]
+
+def _check_github(client: Optional["GitHubClient"]) -> List[DoctorCheck]:
+    """1. Token validation and 2. API rate limit."""
+    if not client:
+        return [
+            DoctorCheck(
+                name="1. GitHub Token Validation",
+                status="warn",
+                detail="No profiles found with tokens to test.",
+            ),
+            DoctorCheck(name="2. GitHub API Rate Limit", status="warn", detail="Skipped."),
+        ]
+    checks: List[DoctorCheck] = []
+    try:
+        val = client.validate_token()
+        status: CheckStatus = "pass" if val.is_valid and not val.needs_warning else "warn"
+        checks.append(DoctorCheck(
+            name="1. GitHub Token Validation",
+            status=status,
+            detail=val.message or "Token valid and scoped correctly.",
+        ))
+        
+        # The /user call above already carried the rate-limit headers; only ask
+        # /rate_limit if it didn't.
+        remaining: Optional[int] = val.rate_remaining
+        if remaining is None:
             resp = client._client.get("/rate_limit")
             if resp.status_code == 200:
-                limit = resp.json().get("rate", {}).get("remaining", "Unknown")
-                status = "pass" if int(limit) > 100 else "warn"
-                checks.append(DoctorCheck(name="2. GitHub API Rate Limit", status=status, detail=f"{limit} requests remaining"))
-            else:
-                checks.append(DoctorCheck(name="2. GitHub API Rate Limit", status="fail", detail="Could not fetch limits."))
-        except Exception as e:
-            checks.append(DoctorCheck(name="1/2. GitHub Checks", status="fail", detail=str(e)))
-        finally:
-            client.close()
-    else:
-        checks.append(DoctorCheck(name="1. GitHub Token Validation", status="warn", detail="No profiles found with tokens to test."))
-        checks.append(DoctorCheck(name="2. GitHub API Rate Limit", status="warn", detail="Skipped."))
+                fetched = resp.json().get("rate", {}).get("remaining")
+                remaining = int(fetched) if fetched is not None else None
+        if remaining is not None:
+            status = "pass" if remaining > 100 else "warn"
+            checks.append(DoctorCheck(
+                name="2. GitHub API Rate Limit",
+                status=status,
+                detail=f"{remaining} requests remaining",
+            ))
+        else:
+            checks.append(DoctorCheck(
+                name="2. GitHub API Rate Limit", status="fail", detail="Could not fetch limits."
+            ))
+    except Exception as e:
+        checks.append(DoctorCheck(name="1/2. GitHub Checks", status="fail", detail=str(e)))
+    return checks
 
-    # 3. Network Latency
+def _check_latency() -> List[DoctorCheck]:
+    """3. Round trip to api.github.com on a fresh connection."""
     try:
         start = time.time()
         httpx.get("https://api.github.com", timeout=5.0)
         ms = int((time.time() - start) * 1000)
-        status = "pass" if ms < 500 else "warn"
-        checks.append(DoctorCheck(name="3. Network Latency", status=status, detail=f"{ms}ms to api.github.com"))
+        status: CheckStatus = "pass" if ms < 500 else "warn"
+        return [DoctorCheck(
+            name="3. Network Latency", status=status, detail=f"{ms}ms to api.github.com"
+        )]
     except Exception as e:
-        checks.append(DoctorCheck(name="3. Network Latency", status="fail", detail=str(e)))
+        return [DoctorCheck(name="3. Network Latency", status="fail", detail=str(e))]
 
-    # 4. Encryption Backend
+def _check_crypto() -> List[DoctorCheck]:
+    """4. Encryption backend and 5. OpenSSL version."""
     import cryptography
-    checks.append(DoctorCheck(name="4. Cryptography Lib", status="pass", detail=f"v{cryptography.__version__}"))
+    checks = [DoctorCheck(
+        name="4. Cryptography Lib", status="pass", detail=f"v{cryptography.__version__}"
+    )]
     
-    # 5. OpenSSL Version
-    checks.append(DoctorCheck(name="5. OpenSSL Engine", status="pass", detail=ssl.OPENSSL_VERSION))
-    
-    # 6. Keyring Backend
+    # SHA-256 is the delta engine's hot loop; OpenSSL >= 1.1.1 uses SHA-NI / ARMv8 SHA2
+    # when present.
+    sha_backend = "OpenSSL" if hashlib.sha256.__name__.startswith("openssl_") else "builtin"
+    modern = sha_backend == "OpenSSL" and ssl.OPENSSL_VERSION_INFO >= (1, 1, 1)
+    status: CheckStatus = "pass" if modern else "warn"
+    checks.append(DoctorCheck(
+        name="5. OpenSSL Engine",
+        status=status,
+        detail=f"{ssl.OPENSSL_VERSION} (SHA-256 via {sha_backend})",
+    ))
+    return checks
+
+def _check_keyring() -> List[DoctorCheck]:
+    """6. Keyring backend."""
     try:
         import keyring
         kr = keyring.get_keyring()
-        checks.append(DoctorCheck(name="6. OS Keyring Backend", status="pass", detail=str(kr.__class__.__name__)))
+        return [DoctorCheck(
+            name="6. OS Keyring Backend", status="pass", detail=str(kr.__class__.__name__)
+        )]
     except Exception as e:
-        checks.append(DoctorCheck(name="6. OS Keyring Backend", status="warn", detail=str(e)))
-        
-    # 7. Profile Validity
-    invalid_count = 0
-    for p in profiles:
-        try:
-            load_profile(p)
-        except Exception:
-            invalid_count += 1
+        return [DoctorCheck(name="6. OS Keyring Backend", status="warn", detail=str(e))]
+
+def _check_profiles(total: int, valid: int) -> List[DoctorCheck]:
+    """7. Profile validity."""
+    invalid_count = total - valid
     if invalid_count == 0:
-        checks.append(DoctorCheck(name="7. Profile Schema", status="pass", detail=f"{len(profiles)} profiles valid"))
-    else:
-        checks.append(DoctorCheck(name="7. Profile Schema", status="fail", detail=f"{invalid_count} profiles corrupted"))
-        
-    # 8. File Permissions
+        return [DoctorCheck(
+            name="7. Profile Schema", status="pass", detail=f"{total} profiles valid"
+        )]
+    return [DoctorCheck(
+        name="7. Profile Schema", status="fail", detail=f"{invalid_count} profiles corrupted"
+    )]
+
+def _check_config_dir() -> List[DoctorCheck]:
+    """8. Config directory and 9. free disk space."""
     config_dir = get_config_dir()
-    checks.append(DoctorCheck(name="8. Config Directory", status="pass", detail=str(config_dir)))
-    
-    # 9. Disk Space
+    checks = [DoctorCheck(name="8. Config Directory", status="pass", detail=str(config_dir))]
     try:
         total, used, free = shutil.disk_usage(config_dir)
         free_gb = free // (2**30)
-        status = "pass" if free_gb > 1 else "warn"
-        checks.append(DoctorCheck(name="9. Disk Space (Config)", status=status, detail=f"{free_gb} GB free"))
+        status: CheckStatus = "pass" if free_gb > 1 else "warn"
+        checks.append(DoctorCheck(
+            name="9. Disk Space (Config)", status=status, detail=f"{free_gb} GB free"
+        ))
     except Exception as e:
         checks.append(DoctorCheck(name="9. Disk Space (Config)", status="fail", detail=str(e)))
-        
-    # 10. Manifest Integrity
-    integrity_status = "pass"
+    return checks
+
+def _check_manifest(client: Optional["GitHubClient"], prof: Optional[Profile]) -> List[DoctorCheck]:
+    """10. Manifest integrity of the profile used for the GitHub checks."""
+    integrity_status: CheckStatus = "pass"
     integrity_detail = "Verified"
-    if client and profiles:
-        prof = load_profile(profiles[0])
-        token = get_profile_token(prof)
-        if token:
-            temp_client = GitHubClient(token)
-            try:
-                manifest = temp_client.download_manifest(prof.repo)
-                if manifest:
-                    from .manifest import verify_integrity
-                    errors = verify_integrity(manifest)
-                    if errors:
-                        integrity_status = "fail"
-                        integrity_detail = f"{len(errors)} issues"
-                else:
-                    integrity_status = "info"
-                    integrity_detail = "No manifest yet"
-            except Exception as e:
-                integrity_status = "fail"
-                integrity_detail = str(e)
-            finally:
-                temp_client.close()
+    if client and prof:
+        try:
+            manifest = client.download_manifest(prof.repo)
+            if manifest:
+                from .manifest import verify_integrity
+                errors = verify_integrity(manifest)
+                if errors:
+                    integrity_status = "fail"
+                    integrity_detail = f"{len(errors)} issues"
+            else:
+                # Not a failure on a fresh repository, but nothing was verified either
+                integrity_status = "warn"
+                integrity_detail = "No manifest yet"
+        except Exception as e:
+            integrity_status = "fail"
+            integrity_detail = str(e)
     else:
         integrity_status = "warn"
         integrity_detail = "Skipped"
-    checks.append(DoctorCheck(name="10. Manifest Integrity", status=integrity_status, detail=integrity_detail))
+    return [DoctorCheck(
+        name="10. Manifest Integrity", status=integrity_status, detail=integrity_detail
+    )]
 
-    # 11. Delta Engine
+def _check_engine() -> List[DoctorCheck]:
+    """11. Delta engine and 12. core dependencies."""
+    checks: List[DoctorCheck] = []
     try:
         from .delta import scan_directory
         checks.append(DoctorCheck(name="11. Delta Hashing Engine", status="pass", detail="Active"))
     except Exception as e:
-        checks.append(DoctorCheck(name="11. Delta Hashing Engine", status="fail", detail=str(e)))
+        checks.append(DoctorCheck(
+            name="11. Delta Hashing Engine", status="fail", detail=str(e)
+        ))
 
-    # 12. Dependencies
-    try:
-        import cryptography
-        import httpx
-        import typer
-        import rich
-        import pydantic
-        import argon2
-        import mnemonic
-        checks.append(DoctorCheck(name="12. Dependencies", status="pass", detail="All core requirements met"))
-    except ImportError as e:
-        checks.append(DoctorCheck(name="12. Dependencies", status="fail", detail=str(e)))
-    
+    # Read installed .dist-info metadata only; nothing is imported or initialised
+    missing = []
+    for name in CORE_DISTRIBUTIONS:
+        try:
+            importlib.metadata.distribution(name)
+        except importlib.metadata.PackageNotFoundError:
+            missing.append(name)
+    if missing:
+        checks.append(DoctorCheck(
+            name="12. Dependencies", status="fail", detail=f"Missing: {', '.join(missing)}"
+        ))
+    else:
+        checks.append(DoctorCheck(
+            name="12. Dependencies", status="pass", detail="All core requirements met"
+        ))
     return checks
@@ -3,8 +3,13 @@ GitHub synchronization client using httpx[http2].
 Handles token validation, rate limits, and chunked uploads.
 """
 import base64
+import json
+import mmap
+import random
 import time
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import httpx
 
@@ -20,6 +25,67 @@ class TokenValidationResult:
         self.token_type = token_type
         self.needs_warning = needs_warning
         self.message = message
+        # X-RateLimit-Remaining of the validating /user response, when it carried one
+        self.rate_remaining: Optional[int] = None
+
+# Raw bytes per base64 chunk; a multiple of 3 so chunks concatenate without padding.
+B64_CHUNK_SIZE = 3 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+MAX_PARALLEL_BLOBS = 4
+# api.github.com and uploads.github.com each multiplex over one HTTP/2 connection; keep them
+# open long enough to bridge the local work (snapshot build, KDF) between a run's requests.
+HTTP_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=4, keepalive_expiry=30.0)
+# Server-error retry backoff bounds, in seconds
+RETRY_BASE_WAIT = 1.0
+RETRY_MAX_WAIT = 30.0
+# Longest rate-limit reset _request will sleep through before raising RateLimitError
+RATE_LIMIT_MAX_SLEEP = 60.0
+UPLOADS_URL = "https://uploads.github.com"
+# Release whose assets hold snapshot bodies; created on first use.
+SNAPSHOT_RELEASE_TAG = "termbackup-snapshots"
+
+class _FileContentBody:
+    """
+    Re-iterable JSON body for the Contents API that base64-encodes a file chunk by chunk
+    from a read-only mmap, so the whole payload is never held in memory at once.
+    """
+    def __init__(self, fields: Dict[str, Any], path: Path):
+        self.path = path
+        self.size = path.stat().st_size
+        self._head = json.dumps(fields)[:-1].encode("utf-8") + b', "content": "'
+        self._tail = b'"}'
+
+    @property
+    def content_length(self) -> int:
+        return len(self._head) + 4 * ((self.size + 2) // 3) + len(self._tail)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._head
+        if self.size:
+            with self.path.open("rb") as f:
+                with (
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+                    memoryview(mm) as view,
+                ):
+                    # Slicing the memoryview hands base64 the mapped pages without an extra copy.
+                    for offset in range(0, self.size, B64_CHUNK_SIZE):
+                        yield base64.b64encode(view[offset:offset + B64_CHUNK_SIZE])
+        yield self._tail
+
+class _FileBody:
+    """Re-iterable raw file body, read in 1 MiB chunks so retries can resend it."""
+    def __init__(self, path: Path):
+        self.path = path
+        self.size = path.stat().st_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        with self.path.open("rb", buffering=0) as f:
+            while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+                yield chunk
+
+def _expect(resp: httpx.Response, codes: Tuple[int, ...], action: str) -> None:
+    if resp.status_code not in codes:
+        raise UploadError(f"Failed to {action}: {resp.status_code} {resp.text}")
 
 class GitHubClient:
     def __init__(self, token: str):
@@ -33,22 +99,36 @@ class GitHubClient:
                 "Accept": "application/vnd.github.v3+json",
                 "X-GitHub-Api-Version": "2022-11-28"
             },
-            timeout=30.0
+            timeout=30.0,
+            limits=HTTP_LIMITS,
         )
+        # (remaining, limit) from the most recent response that carried rate-limit headers.
+        self.last_rate: Optional[Tuple[int, int]] = None
+        # (repo, path) -> blob SHA of files this client has written or looked up,
+        # so updating a file doesn't need a GET for its current SHA first.
+        self._sha_cache: Dict[Tuple[str, str], str] = {}
+        # repo -> id of its snapshot release
+        self._release_ids: Dict[str, int] = {}
+        # repo -> (ETag, parsed manifest) of the last manifest.json this client downloaded
+        self._manifests: Dict[str, Tuple[str, Manifest]] = {}
 
-    def __enter__(self):
+    def __enter__(self) -> "GitHubClient":
         return self
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         self.close()
 
     def close(self) -> None:
         self._client.close()
 
     def _request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
-        """Centralized request handler with exponential backoff and rate limit awareness."""
+        """
+        Centralized request handler with rate limit awareness. Server errors are retried with
+        decorrelated-jitter backoff so concurrent clients don't retry in lockstep; a rate limit
+        that resets soon enough is waited out instead of raised.
+        """
         retries = 3
-        base_wait = 1.0
+        wait = RETRY_BASE_WAIT
         
         for attempt in range(retries):
             response = self._client.request(method, path, **kwargs)
@@ -56,19 +136,33 @@ class GitHubClient:
             # Check rate limits pre-emptively
             if "X-RateLimit-Remaining" in response.headers:
                 remaining = int(response.headers["X-RateLimit-Remaining"])
+                limit = int(response.headers.get("X-RateLimit-Limit", 0))
+                self.last_rate = (remaining, limit)
                 if remaining < 10 and attempt == 0:
-                    from .audit import AuditLogger
-                    AuditLogger().log("github_rate_limit_warning", remaining=remaining)
+                    from .audit import get_audit_logger
+                    get_audit_logger().log("github_rate_limit_warning", remaining=remaining)
             
             if response.status_code == 401:
                 raise AuthenticationError("GitHub token is invalid or expired.")
-            elif response.status_code == 403 and "rate limit" in response.text.lower():
-                reset_time = int(response.headers.get("X-RateLimit-Reset", time.time() + 60))
-                wait_time = max(0.1, reset_time - time.time())
+            elif response.status_code in (403, 429) and (
+                "Retry-After" in response.headers
+                or response.headers.get("X-RateLimit-Remaining") == "0"
+            ):
+                # Secondary limits send Retry-After; the primary limit sends its reset time
+                if "Retry-After" in response.headers:
+                    wait_time = float(response.headers["Retry-After"])
+                else:
+                    reset_time = int(response.headers.get("X-RateLimit-Reset", time.time() + 60))
+                    wait_time = reset_time - time.time()
+                wait_time = max(0.1, wait_time)
+                if attempt < retries - 1 and wait_time <= RATE_LIMIT_MAX_SLEEP:
+                    time.sleep(wait_time)
+                    continue
                 raise RateLimitError(f"GitHub rate limit exceeded. Resets in {int(wait_time)}s.")
             elif response.status_code >= 500:
                 if attempt < retries - 1:
-                    time.sleep(base_wait * (2 ** attempt))
+                    wait = min(RETRY_MAX_WAIT, random.uniform(RETRY_BASE_WAIT, wait * 3))
+                    time.sleep(wait)
                     continue
                 raise UploadError(f"GitHub API error: {response.status_code} - {response.text}")
                 
@@ -84,55 +178,176 @@ class GitHubClient:
         """
         try:
             resp = self._request("GET", "/user")
-            is_valid = resp.status_code == 200
+        except AuthenticationError:
+            return TokenValidationResult(
+                False, [], "unknown", message="Token authentication failed."
+            )
+        
+        result = self._classify_token(resp)
+        # Read from this response rather than last_rate, which other threads may overwrite
+        remaining = resp.headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            result.rate_remaining = int(remaining)
+        return result
+
+    def _classify_token(self, resp: httpx.Response) -> TokenValidationResult:
+        """Turn the /user response into a TokenValidationResult for this client's token."""
+        is_valid = resp.status_code == 200
+        
+        if not is_valid:
+            return TokenValidationResult(False, [], "unknown", message="Token is invalid.")
             
-            if not is_valid:
-                return TokenValidationResult(False, [], "unknown", message="Token is invalid.")
-                
-            scopes_header = resp.headers.get("X-OAuth-Scopes", "")
+        scopes_header = resp.headers.get("X-OAuth-Scopes", "")
+        
+        if self.token.startswith("ghp_"):
+            token_type = "classic"
+            scopes = [s.strip() for s in scopes_header.split(",") if s.strip()]
+            has_repo = "repo" in scopes
+            needs_warning = not has_repo
+            msg = "" if has_repo else "Classic token lacks 'repo' scope."
+            return TokenValidationResult(True, scopes, token_type, needs_warning, msg)
             
-            if self.token.startswith("ghp_"):
-                token_type = "classic"
-                scopes = [s.strip() for s in scopes_header.split(",") if s.strip()]
-                has_repo = "repo" in scopes
-                needs_warning = not has_repo
-                msg = "" if has_repo else "Classic token lacks 'repo' scope."
-                return TokenValidationResult(True, scopes, token_type, needs_warning, msg)
-                
-            elif self.token.startswith("github_pat_"):
-                # Fine-grained
-                token_type = "fine-grained"
-                # Fine-grained tokens don't explicitly list scopes in X-OAuth-Scopes usually.
-                # We do a best-effort check or assume user provided it correctly, warning them to verify.
-                # A true check would require hitting a repo endpoint, but we might not have a repo yet.
-                return TokenValidationResult(True, [], token_type, False, "Fine-grained token detected. Ensure repository write permissions are granted.")
+        elif self.token.startswith("github_pat_"):
+            # Fine-grained
+            token_type = "fine-grained"
+            # Fine-grained tokens don't explicitly list scopes in X-OAuth-Scopes usually.
+            # We do a best-effort check or assume user provided it correctly, warning them
+            # to verify. A true check would require hitting a repo endpoint, but we might not
+            # have a repo yet.
+            return TokenValidationResult(
+                True, [], token_type, False,
+                "Fine-grained token detected. Ensure repository write permissions are granted.",
+            )
+            
+        else:
+            return TokenValidationResult(True, [], "unknown", False, "Unknown token type detected.")
+
+    def upload_file(self, repo: str, path: str, content: Union[bytes, Path], message: str) -> None:
+        """
+        Upload a file to the repository. Handles creating or updating.
+        `content` may be raw bytes or a local file path; files are streamed from disk.
+        """
+        file_url = f"/repos/{repo}/contents/{path}"
+        key = (repo, path)
+        sha = self._sha_cache.get(key)
+        for attempt in range(2):
+            if sha is None:
+                # Check if file exists to get SHA for update
+                get_resp = self._client.get(file_url)
+                if get_resp.status_code == 200:
+                    sha = get_resp.json()["sha"]
+                    
+            payload: Dict[str, Any] = {"message": message}
+            if sha is not None:
+                payload["sha"] = sha
                 
-            else:
-                return TokenValidationResult(True, [], "unknown", False, "Unknown token type detected.")
+            resp = self._send_content("PUT", file_url, payload, content)
+            if resp.status_code in (409, 422) and attempt == 0 and key in self._sha_cache:
+                # Changed elsewhere since we cached its SHA; look it up again
+                del self._sha_cache[key]
+                sha = None
+                continue
+            break
             
-        except AuthenticationError:
-            return TokenValidationResult(False, [], "unknown", message="Token authentication failed.")
+        if resp.status_code not in (200, 201):
+            self._sha_cache.pop(key, None)
+            raise UploadError(f"Failed to upload {path}: {resp.status_code} {resp.text}")
+        self._sha_cache[key] = resp.json()["content"]["sha"]
+
+    def _send_content(
+        self, method: str, url: str, fields: Dict[str, Any], content: Union[bytes, Path]
+    ) -> httpx.Response:
+        """Send a JSON body of `fields` plus base64 `content`, streaming it when given a path."""
+        if isinstance(content, Path):
+            body = _FileContentBody(fields, content)
+            return self._request(
+                method,
+                url,
+                content=body,
+                headers={
+                    "Content-Type": "application/json",
+                    "Content-Length": str(body.content_length),
+                },
+            )
+        payload = dict(fields, content=base64.b64encode(content).decode("ascii"))
+        return self._request(method, url, json=payload)
 
-    def upload_file(self, repo: str, path: str, content: bytes, message: str) -> None:
-        """Upload a file to the repository. Handles creating or updating."""
-        # Check if file exists to get SHA for update
-        encoded_content = base64.b64encode(content).decode("ascii")
+    def commit_files(
+        self, repo: str, files: List[Tuple[str, Union[bytes, Path]]], message: str
+    ) -> None:
+        """
+        Write several files in a single commit through the Git Data API (blobs, tree, commit,
+        ref). An empty repository has no branch to extend, so it falls back to one Contents API
+        upload per file.
+        """
+        staged = self._stage_commit(repo, files, message)
+        if staged is None:
+            for path, content in files:
+                self.upload_file(repo, path, content, message)
+            return
+        self._advance_ref(repo, staged)
+
+    def _stage_commit(
+        self, repo: str, files: List[Tuple[str, Union[bytes, Path]]], message: str
+    ) -> Optional[Tuple[str, str, List[Dict[str, str]]]]:
+        """
+        Create the blobs, tree and commit for `files` on top of the default branch without
+        moving the branch. Returns (branch, commit sha, tree entries), or None for an empty
+        repository.
+        """
+        repo_resp = self._request("GET", f"/repos/{repo}")
+        _expect(repo_resp, (200,), f"read repository {repo}")
+        branch = repo_resp.json().get("default_branch") or "main"
         
-        file_url = f"/repos/{repo}/contents/{path}"
-        get_resp = self._client.get(file_url)
+        ref_resp = self._request("GET", f"/repos/{repo}/git/ref/heads/{branch}")
+        if ref_resp.status_code in (404, 409):
+            return None
+        _expect(ref_resp, (200,), f"read ref heads/{branch}")
+        parent_sha = ref_resp.json()["object"]["sha"]
+        
+        parent_resp = self._request("GET", f"/repos/{repo}/git/commits/{parent_sha}")
+        _expect(parent_resp, (200,), f"read commit {parent_sha}")
+        base_tree = parent_resp.json()["tree"]["sha"]
         
-        payload: Dict[str, Any] = {
-            "message": message,
-            "content": encoded_content
-        }
+        def create_blob(item: Tuple[str, Union[bytes, Path]]) -> Dict[str, str]:
+            path, content = item
+            blob_resp = self._send_content(
+                "POST", f"/repos/{repo}/git/blobs", {"encoding": "base64"}, content
+            )
+            _expect(blob_resp, (201,), f"upload blob for {path}")
+            return {"path": path, "mode": "100644", "type": "blob", "sha": blob_resp.json()["sha"]}
         
-        if get_resp.status_code == 200:
-            # File exists, append sha to update
-            payload["sha"] = get_resp.json()["sha"]
+        # Blobs are independent, so they go up concurrently as streams on the shared HTTP/2
+        # connection
+        if len(files) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(files), MAX_PARALLEL_BLOBS)) as pool:
+                tree = list(pool.map(create_blob, files))
+        else:
+            tree = [create_blob(item) for item in files]
             
-        resp = self._request("PUT", file_url, json=payload)
-        if resp.status_code not in (200, 201):
-            raise UploadError(f"Failed to upload {path}: {resp.status_code} {resp.text}")
+        tree_resp = self._request(
+            "POST", f"/repos/{repo}/git/trees", json={"base_tree": base_tree, "tree": tree}
+        )
+        _expect(tree_resp, (201,), "create tree")
+        
+        commit_resp = self._request(
+            "POST",
+            f"/repos/{repo}/git/commits",
+            json={"message": message, "tree": tree_resp.json()["sha"], "parents": [parent_sha]},
+        )
+        _expect(commit_resp, (201,), "create commit")
+        return branch, commit_resp.json()["sha"], tree
+
+    def _advance_ref(self, repo: str, staged: Tuple[str, str, List[Dict[str, str]]]) -> None:
+        """Fast-forward the branch to a commit made by _stage_commit."""
+        branch, commit_sha, tree = staged
+        update_resp = self._request(
+            "PATCH", f"/repos/{repo}/git/refs/heads/{branch}", json={"sha": commit_sha}
+        )
+        _expect(update_resp, (200,), f"update ref heads/{branch}")
+        # A blob SHA is the Contents API SHA, so later upload_file calls can skip their GET
+        for entry in tree:
+            self._sha_cache[(repo, entry["path"])] = entry["sha"]
 
     def download_file(self, repo: str, path: str, expected_sha256: Optional[str] = None) -> bytes:
         """Download a file's raw content, with optional SHA-256 validation."""
@@ -145,15 +360,193 @@ class GitHubClient:
             
         content = resp.content
         if expected_sha256:
-            from .crypto import compute_sha256
-            if compute_sha256(content) != expected_sha256:
+            from .crypto import compute_sha256, secure_compare_hex
+            if not secure_compare_hex(compute_sha256(content), expected_sha256):
                 raise UploadError(f"SHA-256 mismatch for {path}. Payload is corrupted or tampered.")
                 
         return content
 
+    def download_file_stream(
+        self, repo: str, path: str, dest_path: Path, expected_sha256: Optional[str] = None
+    ) -> None:
+        """
+        Stream a file's raw content to dest_path in 1 MiB chunks, with optional SHA-256
+        validation.
+        """
+        self._stream_to(
+            f"/repos/{repo}/contents/{path}",
+            {"Accept": "application/vnd.github.v3.raw"},
+            dest_path,
+            expected_sha256,
+            f"File {path} not found in {repo}",
+        )
+
+    def _stream_to(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        dest_path: Path,
+        expected_sha256: Optional[str],
+        missing: str,
+    ) -> None:
+        import hashlib
+
+        from .crypto import secure_compare_hex
+
+        hasher = hashlib.sha256() if expected_sha256 else None
+        # Release assets answer with a redirect to storage; httpx drops the token on the
+        # cross-origin hop
+        with self._client.stream("GET", url, headers=headers, follow_redirects=True) as resp:
+            if resp.status_code == 401:
+                raise AuthenticationError("GitHub token is invalid or expired.")
+            if resp.status_code == 404:
+                raise FileNotFoundError(missing)
+            if resp.status_code != 200:
+                raise UploadError(f"Failed to download {dest_path.name}: {resp.status_code}")
+                
+            with dest_path.open("wb", buffering=DOWNLOAD_CHUNK_SIZE) as out:
+                for chunk in resp.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    out.write(chunk)
+                    if hasher:
+                        hasher.update(chunk)
+                        
+        if (
+            expected_sha256 is not None
+            and hasher is not None
+            and not secure_compare_hex(hasher.hexdigest(), expected_sha256)
+        ):
+            dest_path.unlink(missing_ok=True)
+            raise UploadError(
+                f"SHA-256 mismatch for {dest_path.name}. Payload is corrupted or tampered."
+            )
+
+    def _snapshot_release(self, repo: str, create: bool = False) -> Optional[int]:
+        """
+        Id of the release that stores snapshot assets, creating it when `create` is set.
+        None if it doesn't exist, or can't be created yet because the repository has no commits.
+        """
+        if repo in self._release_ids:
+            return self._release_ids[repo]
+        resp = self._request("GET", f"/repos/{repo}/releases/tags/{SNAPSHOT_RELEASE_TAG}")
+        if resp.status_code == 404 and create:
+            resp = self._request(
+                "POST",
+                f"/repos/{repo}/releases",
+                json={
+                    "tag_name": SNAPSHOT_RELEASE_TAG,
+                    "name": "TermBackup snapshots",
+                    "body": "Encrypted snapshot storage managed by TermBackup.",
+                },
+            )
+            if resp.status_code == 422:
+                return None
+            _expect(resp, (201,), "create snapshot release")
+        elif resp.status_code == 404:
+            return None
+        else:
+            _expect(resp, (200,), "read snapshot release")
+        release_id = int(resp.json()["id"])
+        self._release_ids[repo] = release_id
+        return release_id
+
+    def _release_assets(self, repo: str) -> Dict[str, int]:
+        """Asset name -> id for every asset on the snapshot release."""
+        release_id = self._snapshot_release(repo)
+        assets: Dict[str, int] = {}
+        if release_id is None:
+            return assets
+        page = 1
+        while True:
+            resp = self._request(
+                "GET",
+                f"/repos/{repo}/releases/{release_id}/assets",
+                params={"per_page": 100, "page": page},
+            )
+            _expect(resp, (200,), "list snapshot assets")
+            batch = resp.json()
+            assets.update((str(item["name"]), int(item["id"])) for item in batch)
+            if len(batch) < 100:
+                return assets
+            page += 1
+
+    def upload_release_asset(self, repo: str, name: str, path: Path) -> bool:
+        """
+        Upload a file as a raw asset of the snapshot release, streamed from disk with no base64
+        and no Contents API size cap. Returns False if the repository can't hold a release yet.
+        """
+        release_id = self._snapshot_release(repo, create=True)
+        if release_id is None:
+            return False
+        body = _FileBody(path)
+        resp = self._request(
+            "POST",
+            f"{UPLOADS_URL}/repos/{repo}/releases/{release_id}/assets",
+            params={"name": name},
+            content=body,
+            headers={"Content-Type": "application/octet-stream", "Content-Length": str(body.size)},
+        )
+        _expect(resp, (201,), f"upload snapshot asset {name}")
+        return True
+
+    def publish_snapshot(self, repo: str, tbk_path: Path, manifest: Manifest, message: str) -> None:
+        """
+        Store a snapshot as a release asset and commit the updated manifest.
+        A repository without commits can't have a release yet, so there the snapshot
+        is committed to snapshots/ alongside the manifest instead.
+        """
+        manifest_file: Tuple[str, Union[bytes, Path]] = (
+            "manifest.json", serialize_manifest(manifest)
+        )
+        self._manifests.pop(repo, None)
+        # The snapshot upload dominates; stage the manifest commit over the same connection
+        # meanwhile, and only move the branch once the asset is safely stored.
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            asset = pool.submit(self.upload_release_asset, repo, tbk_path.name, tbk_path)
+            try:
+                staged = self._stage_commit(repo, [manifest_file], message)
+            finally:
+                stored = asset.result()
+        if stored and staged is not None:
+            self._advance_ref(repo, staged)
+        elif stored:
+            self.commit_files(repo, [manifest_file], message)
+        else:
+            self.commit_files(
+                repo, [(f"snapshots/{tbk_path.name}", tbk_path), manifest_file], message
+            )
+
+    def download_snapshot(
+        self, repo: str, filename: str, dest_path: Path, expected_sha256: Optional[str] = None
+    ) -> None:
+        """
+        Stream a snapshot to dest_path from the snapshot release, or from snapshots/
+        for older uploads.
+        """
+        asset_id = self._release_assets(repo).get(filename)
+        if asset_id is None:
+            self.download_file_stream(repo, f"snapshots/{filename}", dest_path, expected_sha256)
+            return
+        self._stream_to(
+            f"/repos/{repo}/releases/assets/{asset_id}",
+            {"Accept": "application/octet-stream"},
+            dest_path,
+            expected_sha256,
+            f"Snapshot {filename} not found in {repo}",
+        )
+
+    def delete_snapshot(self, repo: str, filename: str, message: str) -> None:
+        """Delete a snapshot wherever it is stored."""
+        asset_id = self._release_assets(repo).get(filename)
+        if asset_id is None:
+            self.delete_file(repo, f"snapshots/{filename}", message)
+            return
+        resp = self._request("DELETE", f"/repos/{repo}/releases/assets/{asset_id}")
+        _expect(resp, (204,), f"delete snapshot asset {filename}")
+
     def delete_file(self, repo: str, path: str, message: str) -> None:
         """Delete a file from the repository."""
         file_url = f"/repos/{repo}/contents/{path}"
+        self._sha_cache.pop((repo, path), None)
         resp = self._request("GET", file_url)
         if resp.status_code == 404:
             return
@@ -165,28 +558,65 @@ class GitHubClient:
         res.raise_for_status()
 
     def list_snapshots(self, repo: str) -> List[str]:
-        """List snapshot IDs directly from the repository structure."""
+        """List snapshot files in snapshots/ and on the snapshot release."""
         try:
             resp = self._request("GET", f"/repos/{repo}/contents/snapshots")
-            if resp.status_code == 404:
-                return []
-            if resp.status_code != 200:
+            if resp.status_code not in (200, 404):
                 raise UploadError("Failed to list snapshots.")
             
-            data = resp.json()
-            return [str(item["name"]) for item in data if isinstance(item, dict) and str(item["name"]).endswith(".tbk")]
+            data = resp.json() if resp.status_code == 200 else []
+            names = [
+                str(item["name"]) for item in data
+                if isinstance(item, dict) and str(item["name"]).endswith(".tbk")
+            ]
+            names.extend(name for name in self._release_assets(repo) if name.endswith(".tbk"))
+            return names
         except FileNotFoundError:
             return []
 
     def upload_manifest(self, repo: str, manifest: Manifest) -> None:
         """Upload the updated manifest.json."""
         content = serialize_manifest(manifest)
+        self._manifests.pop(repo, None)
         self.upload_file(repo, "manifest.json", content, "Update manifest")
 
-    def download_manifest(self, repo: str) -> Optional[Manifest]:
-        """Download and parse manifest.json."""
-        try:
-            data = self.download_file(repo, "manifest.json")
-            return load_manifest(data)
-        except FileNotFoundError:
+    def download_manifest(self, repo: str, cache_file: Optional[Path] = None) -> Optional[Manifest]:
+        """
+        Download and parse manifest.json.
+        A manifest this client has already parsed is revalidated with If-None-Match and returned
+        as-is on 304; with `cache_file`, a local copy (and its ETag) serves the same purpose
+        across processes.
+        """
+        etag_file = cache_file.with_suffix(".etag") if cache_file else None
+        headers = {"Accept": "application/vnd.github.v3.raw"}
+        cached = self._manifests.get(repo)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        elif cache_file and etag_file and cache_file.exists() and etag_file.exists():
+            headers["If-None-Match"] = etag_file.read_text(encoding="utf-8").strip()
+            
+        resp = self._request("GET", f"/repos/{repo}/contents/manifest.json", headers=headers)
+        if resp.status_code == 304 and cached:
+            return cached[1]
+        if resp.status_code == 304 and cache_file:
+            manifest = load_manifest(cache_file.read_bytes())
+            self._manifests[repo] = (headers["If-None-Match"], manifest)
+            return manifest
+        if resp.status_code == 404:
+            self._manifests.pop(repo, None)
             return None
+        if resp.status_code != 200:
+            raise UploadError(f"Failed to download manifest.json: {resp.status_code}")
+            
+        manifest = load_manifest(resp.content)
+        etag = resp.headers.get("ETag")
+        if etag:
+            self._manifests[repo] = (etag, manifest)
+            if cache_file and etag_file:
+                try:
+                    cache_file.parent.mkdir(parents=True, exist_ok=True)
+                    cache_file.write_bytes(resp.content)
+                    etag_file.write_text(etag, encoding="utf-8")
+                except OSError:
+                    pass
+        return manifest
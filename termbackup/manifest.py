@@ -1,7 +1,8 @@
 """
 Manifest logic for termbackup. Immutable append-only record.
 """
-import json
+import bisect
+from operator import attrgetter
 
 from .errors import ManifestError
 from .models import Manifest, ManifestEntry
@@ -14,8 +15,8 @@ def create_initial_manifest() -> Manifest:
 def load_manifest(data: bytes) -> Manifest:
     """Deserialize and validate a manifest payload."""
     try:
-        parsed = json.loads(data.decode("utf-8"))
-        return Manifest(**parsed)
+        # pydantic parses and validates in one pass in Rust, without an intermediate dict
+        return Manifest.model_validate_json(data)
     except Exception as e:
         raise ManifestError(f"Failed to parse manifest: {e}") from e
 
@@ -27,10 +28,14 @@ def append_entry(manifest: Manifest, entry: ManifestEntry) -> Manifest:
     """Immutable append of a new snapshot entry to the manifest."""
     # Create a new list to enforce immutability strictly
     new_entries = manifest.entries.copy()
-    new_entries.append(entry)
     
-    # Sort them by snapshot timestamp based on snapshot_id prefix (which is YYYYMMDD_HHMMSS)
-    new_entries.sort(key=lambda x: x.snapshot_id)
+    # Keep them sorted by snapshot timestamp based on snapshot_id prefix (which is YYYYMMDD_HHMMSS).
+    # Entries are always stored sorted, and a new snapshot is normally the newest, so it just
+    # goes on the end; otherwise it is inserted after any equal IDs, as a stable sort would.
+    if not new_entries or new_entries[-1].snapshot_id <= entry.snapshot_id:
+        new_entries.append(entry)
+    else:
+        bisect.insort_right(new_entries, entry, key=attrgetter("snapshot_id"))
     
     return Manifest(version=manifest.version, entries=new_entries)
 
@@ -40,9 +45,19 @@ def verify_integrity(manifest: Manifest) -> list[str]:
     For this basic check, we just ensure no duplicate snapshot IDs and correct ordering.
     In a true implementation, we'd also check signature chains if they existed inside the manifest.
     """
+    entries = manifest.entries
+    ids = [entry.snapshot_id for entry in entries]
+    if len(set(ids)) == len(ids):
+        # No duplicates (the normal case): only the hashes need checking
+        return [
+            f"Invalid SHA-256 for snapshot {entry.snapshot_id}"
+            for entry in entries
+            if not entry.sha256 or len(entry.sha256) != 64
+        ]
+    
     errors = []
     seen = set()
-    for entry in manifest.entries:
+    for entry in entries:
         if entry.snapshot_id in seen:
             errors.append(f"Duplicate snapshot ID in manifest: {entry.snapshot_id}")
         seen.add(entry.snapshot_id)
@@ -3,10 +3,14 @@ Pydantic v2 data models for TermBackup.
 """
 import re
 from datetime import datetime
-from typing import List, Literal, Optional
+from functools import cached_property
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
+# \Z rather than $, so a trailing newline can't slip through
+_REPO_RE = re.compile(r"^[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+\Z")
+
 
 class FrozenModel(BaseModel):
     model_config = ConfigDict(frozen=True)
@@ -22,13 +26,14 @@ class Profile(FrozenModel):
     master_key_salt: str     # Base64 encoded Argon2 salt for the password
     recovery_key_enc: str    # Base64 encoded, DEK encrypted with Recovery Phrase
     recovery_key_salt: str   # Base64 encoded salt for the recovery phrase KDF
+    recovery_kdf: Optional[str] = None  # Recovery KDF id; None means the password KDF parameters
     signing_public_key: Optional[str] = None # Base64 encoded Ed25519 public key
     signing_private_key_enc: Optional[str] = None # Base64 encoded, DEK encrypted private key
 
     @field_validator("repo")
     @classmethod
     def validate_repo(cls, v: str) -> str:
-        if not re.match(r"^[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+$", v):
+        if not _REPO_RE.match(v):
             raise ValueError("Repo must be in 'owner/name' format")
         return v
 
@@ -46,6 +51,7 @@ class SnapshotMeta(FrozenModel):
     total_size: int
     salt_b64: str
     nonce_b64: str
+    sha256: Optional[str] = None  # SHA-256 of the written .tbk container
 
 class ManifestEntry(FrozenModel):
     snapshot_id: str
@@ -58,6 +64,14 @@ class Manifest(FrozenModel):
     version: str = "2.0"
     entries: List[ManifestEntry] = Field(default_factory=list)
 
+    @cached_property
+    def _index(self) -> Dict[str, ManifestEntry]:
+        return {e.snapshot_id: e for e in self.entries}
+
+    def by_id(self) -> Dict[str, ManifestEntry]:
+        """Map snapshot IDs to entries; built once per (immutable) manifest."""
+        return self._index
+
 class DeltaResult(FrozenModel):
     added: List[FileFingerprint] = Field(default_factory=list)
     modified: List[FileFingerprint] = Field(default_factory=list)
@@ -70,7 +84,9 @@ class PluginMeta(FrozenModel):
     entry_point: str
     verified: bool
 
+CheckStatus = Literal["pass", "warn", "fail"]
+
 class DoctorCheck(FrozenModel):
     name: str
-    status: Literal["pass", "warn", "fail"]
+    status: CheckStatus
     detail: str
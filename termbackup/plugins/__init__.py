@@ -3,7 +3,8 @@ TermBackup Nexus Extension Subsystem.
 Provides a sandboxed plugin architecture for controlled extensions.
 """
 import importlib.metadata
-from typing import Any, List, Protocol
+from functools import cache
+from typing import Any, FrozenSet, List, Protocol, Tuple, runtime_checkable
 
 from ..models import Profile, SnapshotMeta
 from ..ui import render_status
@@ -24,6 +25,12 @@ class PluginAPI:
         
     # Notice: NO access to secret keys, crypto functions, or raw tokens.
 
+REQUIRED_METHODS: FrozenSet[str] = frozenset({
+    "on_snapshot_pre", "on_snapshot_post",
+    "on_restore_pre", "on_restore_post",
+})
+
+@runtime_checkable
 class TermBackupPlugin(Protocol):
     """Protocol that all TermBackup plugins must implement."""
     name: str
@@ -42,7 +49,12 @@ class TermBackupPlugin(Protocol):
         ...
 
 def load_plugins() -> List[TermBackupPlugin]:
-    """Discover and load verified plugins via entry points."""
+    """Discover and load verified plugins via entry points (once per process)."""
+    return list(_discover_plugins())
+
+@cache
+def _discover_plugins() -> Tuple[TermBackupPlugin, ...]:
+    # Entry point resolution scans every installed distribution's metadata, so it runs once
     plugins: List[TermBackupPlugin] = []
     
     try:
@@ -62,19 +74,16 @@ def load_plugins() -> List[TermBackupPlugin]:
         # If no plugins or metadata issues
         pass
         
-    return plugins
+    return tuple(plugins)
 
 def validate_plugin(plugin: Any) -> bool:
     """Ensure plugin respects the protocol and doesn't violate obvious sandbox rules."""
-    if not hasattr(plugin, "name") or not hasattr(plugin, "version"):
+    # The runtime-checkable protocol covers presence of name, version and the hooks
+    if not isinstance(plugin, TermBackupPlugin):
         return False
         
-    required_methods = [
-        "on_snapshot_pre", "on_snapshot_post",
-        "on_restore_pre", "on_restore_post"
-    ]
-    for method in required_methods:
-        if not hasattr(plugin, method) or not callable(getattr(plugin, method)):
+    for method in REQUIRED_METHODS:
+        if not callable(getattr(plugin, method)):
             return False
             
     # Check for forbidden imports heuristically if we wanted true sandboxing,
@@ -3,7 +3,7 @@ Enhanced Audit Logging Plugin.
 """
 from typing import Any
 
-from ..audit import AuditLogger
+from ..audit import get_audit_logger
 from ..plugins import PluginAPI
 
 
@@ -12,7 +12,7 @@ class StrictAuditPlugin:
     version = "1.0.0"
     
     def __init__(self):
-        self.logger = AuditLogger()
+        self.logger = get_audit_logger()
     
     def on_snapshot_pre(self, api: PluginAPI) -> None:
         self.logger.log("plugin_strict_audit", action="snapshot_pre", profile=api.profile_name)
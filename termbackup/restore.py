@@ -2,67 +2,205 @@
 Chronos Multi-Epoch Restore engine.
 Safely extracts validated paths, diffs against filesystem, previews trees.
 """
-import tarfile
-import gzip
+import hashlib
 import io
 import os
+import shutil
+import tarfile
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, BinaryIO, Iterator, List, Optional, Union
 
 from rich.tree import Tree
 
-from .models import Profile, SnapshotMeta, DeltaResult
-from .errors import RestoreExtractionError, DecryptionError
-from .crypto import derive_key, decrypt, verify
+try:
+    from isal import igzip as gzip
+except ImportError:
+    import gzip
+
+from .crypto import _aesgcm, verify
+from .errors import DecryptionError, RestoreExtractionError
+from .models import DeltaResult, Profile, SnapshotMeta
+from .snapshot import (
+    FRAME_HEADER,
+    FRAME_SIZE,
+    HEADER,
+    HEADER_V7,
+    MAGIC_BYTES,
+    MAGIC_BYTES_V7,
+    get_master_dek,
+)
 from .utils import validate_path
-from .snapshot import MAGIC_BYTES, get_master_dek
 
+# Block size for copying restored files out of the archive
+RESTORE_COPY_SIZE = 1 << 20
+# Restored files at least this large are dropped from the page cache once written
+FADVISE_MIN_SIZE = 64 << 20
 
 
-def _read_snapshot_payload(tbk_path: Path, dek: bytes, public_key_raw: Optional[bytes] = None) -> bytes:
-    """Reads the .tbk file, verifies signature, and decrypts it with the DEK."""
-    with tbk_path.open("rb") as f:
-        magic = f.read(len(MAGIC_BYTES))
-        if magic != MAGIC_BYTES:
-            raise RestoreExtractionError(f"Invalid magic bytes in {tbk_path}. Not a valid tbk file.")
-            
-        nonce = f.read(12)
-        sig_len_bytes = f.read(2)
-        if len(sig_len_bytes) < 2:
-            raise RestoreExtractionError("File too short.")
-        sig_len = int.from_bytes(sig_len_bytes, "big")
-        
-        signature = f.read(sig_len)
-        encrypted_payload = f.read()
+class _FrameReader(io.RawIOBase):
+    """
+    Read-only stream over the decrypted frames of a v8 container. Frames are
+    opened one at a time, so memory stays at one frame however large the snapshot.
+    """
+    def __init__(self, f: BinaryIO, aesgcm: Any, prefix: bytes, end: int):
+        self._f = f
+        self._aesgcm = aesgcm
+        self._prefix = prefix
+        self._end = end
+        self._counter = 0
+        self._pending = memoryview(b"")
+        self._done = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        while not self._pending and not self._done:
+            self._open_frame()
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def _open_frame(self) -> None:
+        header = self._f.read(FRAME_HEADER.size)
+        if len(header) < FRAME_HEADER.size:
+            raise RestoreExtractionError("Snapshot is truncated: missing final frame.")
+        final, ct_len = FRAME_HEADER.unpack(header)
+        sealed = self._f.read(ct_len)
+        if len(sealed) < ct_len or self._f.tell() > self._end:
+            raise RestoreExtractionError("Snapshot is truncated inside a frame.")
+        nonce = self._prefix + self._counter.to_bytes(4, "big")
+        try:
+            plaintext = self._aesgcm.decrypt(nonce, sealed, header)
+        except Exception as e:
+            raise DecryptionError(f"Failed to decrypt snapshot frame {self._counter}: {e}") from e
+        self._counter += 1
+        if final:
+            if self._f.tell() != self._end:
+                raise RestoreExtractionError("Unexpected data after the final snapshot frame.")
+            self._done = True
+        self._pending = memoryview(plaintext)
+
+    def close(self) -> None:
+        self._f.close()
+        super().close()
+
+def _hash_range(f: BinaryIO, length: int) -> bytes:
+    """SHA-256 of the next `length` bytes of f."""
+    hasher = hashlib.sha256()
+    while length > 0:
+        chunk = f.read(min(length, FRAME_SIZE))
+        if not chunk:
+            break
+        hasher.update(chunk)
+        length -= len(chunk)
+    return hasher.digest()
+
+def _read_v7_payload(
+    f: BinaryIO, header: bytes, dek: bytes, public_key_raw: Optional[bytes]
+) -> bytes:
+    """Verify and decrypt a single-shot v7 container whose fixed header has already been read."""
+    _, nonce, sig_len = HEADER_V7.unpack(header)
+    signature = f.read(sig_len)
+    encrypted_payload = f.read()
         
     if public_key_raw:
         if not verify(encrypted_payload, signature, public_key_raw):
             raise RestoreExtractionError("Signature verification failed. The snapshot may have been tampered with.")
             
     try:
-        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-        aesgcm = AESGCM(dek)
-        plaintext = aesgcm.decrypt(nonce, encrypted_payload, None)
-        return plaintext
+        return _aesgcm(dek).decrypt(nonce, encrypted_payload, None)
     except Exception as e:
         raise DecryptionError(f"Failed to decrypt snapshot: {e}") from e
 
+def _open_snapshot_payload(
+    tbk_path: Path, dek: bytes, public_key_raw: Optional[bytes] = None
+) -> Union[io.RawIOBase, BinaryIO]:
+    """
+    Open the .tbk file, verify its signature, and return a readable stream of the
+    decrypted gzip payload. v8 containers are decrypted frame by frame as they are read.
+    """
+    f = tbk_path.open("rb")
+    try:
+        # One read covers the longer (v7) fixed header; the magic picks the layout
+        head = f.read(HEADER_V7.size)
+        magic = head[:len(MAGIC_BYTES)]
+        if magic not in (MAGIC_BYTES, MAGIC_BYTES_V7):
+            raise RestoreExtractionError(
+                f"Invalid magic bytes in {tbk_path}. Not a valid tbk file."
+            )
+        if len(head) < HEADER_V7.size:
+            raise RestoreExtractionError("File too short.")
+        if magic == MAGIC_BYTES_V7:
+            with f:
+                return io.BytesIO(_read_v7_payload(f, head, dek, public_key_raw))
+        
+        _, prefix = HEADER.unpack_from(head)
+        header_len = HEADER.size
+        size = f.seek(0, os.SEEK_END)
+        if size < header_len + 2:
+            raise RestoreExtractionError("File too short.")
+        f.seek(size - 2)
+        sig_len = int.from_bytes(f.read(2), "big")
+        frames_end = size - 2 - sig_len
+        if frames_end < header_len:
+            raise RestoreExtractionError("File too short.")
+        
+        if public_key_raw:
+            # Verify before decrypting anything: one sequential read of header and frames
+            f.seek(0)
+            digest = _hash_range(f, frames_end)
+            signature = f.read(sig_len)
+            if not verify(digest, signature, public_key_raw):
+                raise RestoreExtractionError(
+                    "Signature verification failed. The snapshot may have been tampered with."
+                )
+        
+        f.seek(header_len)
+        return _FrameReader(f, _aesgcm(dek), prefix, frames_end)
+    except BaseException:
+        f.close()
+        raise
+
+def _drop_written_pages(f: BinaryIO) -> None:
+    """Write back a freshly restored file and drop its pages from the page cache."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    f.flush()
+    # DONTNEED skips dirty pages, so they must reach the disk first or the hint is a no-op
+    os.fdatasync(f.fileno())
+    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+def _iter_members(tar: tarfile.TarFile) -> Iterator[tarfile.TarInfo]:
+    """Yield archive members one at a time without TarFile retaining each TarInfo."""
+    while (member := tar.next()) is not None:
+        # CPython's TarFile.next() appends to the undocumented TarFile.members list, which
+        # would keep one TarInfo per file alive until close. Clearing it relies on that
+        # implementation detail; if the attribute ever changes this is plain iteration.
+        retained = getattr(tar, "members", None)
+        if isinstance(retained, list):
+            retained.clear()
+        yield member
+
 def preview_tree(tbk_path: Path, profile: Profile, password: str, public_key_raw: Optional[bytes] = None) -> Tree:
     """Decrypt the snapshot in memory and generate a Rich Tree preview of its contents."""
     dek = get_master_dek(profile, password)
-    plaintext = _read_snapshot_payload(tbk_path, dek, public_key_raw)
+    payload = _open_snapshot_payload(tbk_path, dek, public_key_raw)
     
-    buffer = io.BytesIO(plaintext)
     tree = Tree(f"📦 [bold cyan]{tbk_path.name}[/]")
     
     try:
-        with gzip.GzipFile(fileobj=buffer, mode="rb") as gz:
-            with tarfile.open(fileobj=gz, mode="r") as tar:
-                for member in tar.getmembers():
+        # Stream mode: members are read in archive order straight off the decrypted frames
+        with payload, gzip.GzipFile(fileobj=payload, mode="rb") as gz:
+            with tarfile.open(fileobj=gz, mode="r|") as tar:
+                for member in _iter_members(tar):
                     if member.name == ".tbk_meta.json":
                         continue
                     # A naive flat tree for now, in a real TUI we'd nest the folders
                     tree.add(f"[green]{member.name}[/] ({member.size} B)")
+    except (RestoreExtractionError, DecryptionError):
+        raise
     except Exception as e:
         raise RestoreExtractionError(f"Failed to read tar archive: {e}") from e
         
@@ -70,25 +208,25 @@ def preview_tree(tbk_path: Path, profile: Profile, password: str, public_key_raw
 
 def diff_snapshot(tbk_path: Path, profile: Profile, password: str, target_dir: Path, public_key_raw: Optional[bytes] = None) -> DeltaResult:
     """Compare what is in the snapshot vs what's currently in target_dir."""
-    from .delta import scan_directory, FileFingerprint, compute_delta
-    import hashlib
+    from .delta import FileFingerprint, compute_delta, scan_directory
     
     target_dir = Path(target_dir).resolve()
     if not target_dir.exists():
         target_dir.mkdir(parents=True, exist_ok=True)
         
-    current_files = scan_directory(target_dir, profile.exclude_patterns)
+    # Comparing is read-only: don't create or rewrite the fingerprint cache for target_dir
+    current_files = scan_directory(target_dir, profile.exclude_patterns, use_cache=False)
     
     dek = get_master_dek(profile, password)
-    plaintext = _read_snapshot_payload(tbk_path, dek, public_key_raw)
+    payload = _open_snapshot_payload(tbk_path, dek, public_key_raw)
     
-    buffer = io.BytesIO(plaintext)
     snapshot_files: List[FileFingerprint] = []
     
     try:
-        with gzip.GzipFile(fileobj=buffer, mode="rb") as gz:
-            with tarfile.open(fileobj=gz, mode="r") as tar:
-                for member in tar.getmembers():
+        # Stream mode: members are read in archive order straight off the decrypted frames
+        with payload, gzip.GzipFile(fileobj=payload, mode="rb") as gz:
+            with tarfile.open(fileobj=gz, mode="r|") as tar:
+                for member in _iter_members(tar):
                     if member.name == ".tbk_meta.json" or not member.isfile():
                         continue
                         
@@ -97,7 +235,7 @@ def diff_snapshot(tbk_path: Path, profile: Profile, password: str, target_dir: P
                         continue
                         
                     hasher = hashlib.sha256()
-                    for chunk in iter(lambda: f_in.read(65536), b""):
+                    while chunk := f_in.read(RESTORE_COPY_SIZE):
                         hasher.update(chunk)
                         
                     snapshot_files.append(FileFingerprint(
@@ -106,6 +244,8 @@ def diff_snapshot(tbk_path: Path, profile: Profile, password: str, target_dir: P
                         size=member.size,
                         mtime=member.mtime
                     ))
+    except (RestoreExtractionError, DecryptionError):
+        raise
     except Exception as e:
         raise RestoreExtractionError(f"Failed to read archive for diff: {e}") from e
         
@@ -124,16 +264,16 @@ def restore_snapshot(
     Strict path traversal prevention applied.
     """
     dek = get_master_dek(profile, password)
-    plaintext = _read_snapshot_payload(tbk_path, dek, public_key_raw)
+    payload = _open_snapshot_payload(tbk_path, dek, public_key_raw)
     
     target_dir = Path(target_dir).resolve()
     target_dir.mkdir(parents=True, exist_ok=True)
     
-    buffer = io.BytesIO(plaintext)
     try:
-        with gzip.GzipFile(fileobj=buffer, mode="rb") as gz:
-            with tarfile.open(fileobj=gz, mode="r") as tar:
-                for member in tar.getmembers():
+        # Stream mode: members are read in archive order straight off the decrypted frames
+        with payload, gzip.GzipFile(fileobj=payload, mode="rb") as gz:
+            with tarfile.open(fileobj=gz, mode="r|") as tar:
+                for member in _iter_members(tar):
                     if member.name == ".tbk_meta.json":
                         continue
                         
@@ -157,12 +297,15 @@ def restore_snapshot(
                         f_in = tar.extractfile(member)
                         if f_in:
                             with extracted_path.open("wb") as f_out:
-                                f_out.write(f_in.read())
+                                shutil.copyfileobj(f_in, f_out, RESTORE_COPY_SIZE)
+                                if member.size >= FADVISE_MIN_SIZE:
+                                    # Large restores shouldn't evict the rest of the page cache
+                                    _drop_written_pages(f_out)
                             
                             # Restore mtime
                             os.utime(extracted_path, (member.mtime, member.mtime))
                             
-    except RestoreExtractionError:
+    except (RestoreExtractionError, DecryptionError):
         raise
     except Exception as e:
         raise RestoreExtractionError(f"Extraction failed: {e}") from e
@@ -3,26 +3,57 @@ Quantum Delta Snapshot Engine implementation.
 Packages, compresses, encrypts, and signs snapshots.
 """
 import base64
-import gzip
+import hashlib
 import io
 import os
+import struct
 import tarfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, BinaryIO, Callable, Deque, List, Optional, Tuple, Union
+
+try:
+    # ISA-L's DEFLATE writes the same gzip stream several times faster than zlib
+    from isal import igzip as gzip
+    GZIP_COMPRESSLEVEL = 2  # ISA-L levels run 0-3
+except ImportError:
+    import gzip
+    GZIP_COMPRESSLEVEL = 6
 
 from .crypto import (
+    _aesgcm,
     decrypt,
     derive_key,
-    generate_nonce,
     sign,
 )
 from .delta import scan_directory
 from .errors import DecryptionError, SnapshotCreationError
-from .models import Profile, SnapshotMeta
+from .models import FileFingerprint, Profile, SnapshotMeta
 from .utils import timestamp_id
 
-MAGIC_BYTES = b"TBK\x07"
+# Framed container (v8):
+# [MAGIC 4] [NONCE_PREFIX 8] {[FINAL 1] [CT_LEN 4] [CIPHERTEXT+TAG ...]}... [SIG ...] [SIG_LEN 2]
+# Each frame is AES-GCM sealed on its own with nonce = prefix || frame counter, and its
+# 5-byte header as associated data, so frames cannot be reordered, resized or truncated.
+# The Ed25519 signature covers the SHA-256 of everything before the trailer.
+MAGIC_BYTES = b"TBK\x08"
+# Single-shot container (v7), still readable:
+# [MAGIC 4] [NONCE 12] [SIG_LEN 2] [SIG ...] [ENCRYPTED_PAYLOAD]
+MAGIC_BYTES_V7 = b"TBK\x07"
+NONCE_PREFIX_LEN = 8
+HEADER = struct.Struct(f">4s{NONCE_PREFIX_LEN}s")  # magic, nonce prefix
+HEADER_V7 = struct.Struct(">4s12sH")  # magic, nonce, signature length
+FRAME_SIZE = 1 << 20
+FRAME_HEADER = struct.Struct(">BI")
+# Read size when copying file bodies into the archive
+COPY_BUFFER_SIZE = 1 << 20
+# Files up to this size are read ahead by worker threads while gzip compresses the
+# previous ones; at most PREFETCH_WINDOW of them are held in memory at a time.
+PREFETCH_MAX_SIZE = 1 << 20
+PREFETCH_WINDOW = 8
+PREFETCH_WORKERS = 4
 
 def get_master_dek(profile: Profile, password: str) -> bytes:
     """Decrypt the Master DEK using the user's password."""
@@ -36,6 +67,111 @@ def get_master_dek(profile: Profile, password: str) -> bytes:
     except DecryptionError:
         raise DecryptionError("Incorrect password for this profile.")
 
+class _HashingWriter:
+    """Binary file wrapper that feeds every byte written through SHA-256 on the way to disk."""
+    def __init__(self, fh: BinaryIO) -> None:
+        self.fh = fh
+        self.hasher = hashlib.sha256()
+
+    def write(self, data: Union[bytes, bytearray, memoryview]) -> int:
+        self.hasher.update(data)
+        return self.fh.write(data)
+
+class _FrameWriter:
+    """
+    Write-only file object that seals everything written to it into fixed-size
+    AES-GCM frames, so the compressed archive never has to be held in memory.
+    """
+    def __init__(self, f_out: Any, aesgcm: Any, prefix: bytes):
+        self._out = f_out
+        self._aesgcm = aesgcm
+        self._prefix = prefix
+        self._buf = bytearray()
+        self._counter = 0
+
+    def write(self, data: bytes) -> int:
+        self._buf += data
+        # Hold back at least one byte so the last frame is always the one written by close().
+        # Full frames are sealed straight from views of the buffer, then dropped in one move.
+        if len(self._buf) > FRAME_SIZE:
+            sealed = 0
+            with memoryview(self._buf) as view:
+                while len(view) - sealed > FRAME_SIZE:
+                    self._seal(view[sealed:sealed + FRAME_SIZE], final=False)
+                    sealed += FRAME_SIZE
+            del self._buf[:sealed]
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self._seal(self._buf, final=True)
+        self._buf.clear()
+
+    def _seal(self, chunk: Union[bytes, bytearray, memoryview], final: bool) -> None:
+        if self._counter > 0xFFFFFFFF:
+            raise SnapshotCreationError("Snapshot exceeds the maximum number of frames.")
+        header = FRAME_HEADER.pack(final, len(chunk) + 16)
+        nonce = self._prefix + self._counter.to_bytes(4, "big")
+        sealed = self._aesgcm.encrypt(nonce, chunk, header)
+        self._counter += 1
+        self._out.write(header)
+        self._out.write(sealed)
+
+def _tar_info(name: str, st: os.stat_result, size: int) -> tarfile.TarInfo:
+    ti = tarfile.TarInfo(name=name)
+    ti.size = size
+    ti.mtime = int(st.st_mtime)
+    ti.mode = st.st_mode & 0o7777
+    return ti
+
+# Stat and contents of a file read ahead on the prefetch pool
+_SmallFile = Tuple[os.stat_result, bytes]
+
+def _read_small(path: str) -> _SmallFile:
+    with open(path, "rb", buffering=0) as src:
+        return os.fstat(src.fileno()), src.readall()
+
+def _open_tar_stream(fileobj: BinaryIO) -> tarfile.TarFile:
+    """Open a write-only tar stream that copies member data in COPY_BUFFER_SIZE reads."""
+    # TarFile accepts copybufsize in every mode, but typeshed's open() overloads omit it
+    open_tar: Callable[..., tarfile.TarFile] = tarfile.open
+    return open_tar(fileobj=fileobj, mode="w|", copybufsize=COPY_BUFFER_SIZE)
+
+def _add_files(tar: tarfile.TarFile, root: str, fingerprints: List[FileFingerprint]) -> None:
+    """
+    Append the scanned files to the archive in fingerprint order.
+
+    Headers are built from one open and fstat per file rather than tar.add()'s
+    lstat and uid/gid name lookups, and sizes come from the open file so a file
+    that changed since the scan is still archived consistently. Small files are
+    read ahead on a thread pool (file reads and zlib both release the GIL), so
+    disk latency overlaps with compression; large files are streamed inline.
+    """
+    with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as pool:
+        pending: Deque[Tuple[FileFingerprint, Optional[Future[_SmallFile]]]] = deque()
+        upcoming = iter(fingerprints)
+        while True:
+            while len(pending) < PREFETCH_WINDOW:
+                fp = next(upcoming, None)
+                if fp is None:
+                    break
+                future = None
+                if fp.size <= PREFETCH_MAX_SIZE:
+                    future = pool.submit(_read_small, os.path.join(root, fp.relative_path))
+                pending.append((fp, future))
+            if not pending:
+                break
+            fp, future = pending.popleft()
+            if future is not None:
+                st, data = future.result()
+                tar.addfile(_tar_info(fp.relative_path, st, len(data)), io.BytesIO(data))
+                continue
+            with open(os.path.join(root, fp.relative_path), "rb", buffering=0) as src:
+                st = os.fstat(src.fileno())
+                tar.addfile(_tar_info(fp.relative_path, st, st.st_size), src)
+
 def create_snapshot(
     profile: Profile, 
     password: str,
@@ -64,8 +200,8 @@ def create_snapshot(
     file_count = len(fingerprints)
     total_size = sum(f.size for f in fingerprints)
     
-    # Generate unique AES-GCM nonce for this specific snapshot payload
-    nonce = generate_nonce()
+    # Random per-snapshot nonce prefix; the frame counter fills the last 4 bytes
+    prefix = os.urandom(NONCE_PREFIX_LEN)
     
     # Generate snapshot ID
     snap_id = timestamp_id()
@@ -75,48 +211,36 @@ def create_snapshot(
     temp_dir.mkdir(parents=True, exist_ok=True)
     tbk_path = temp_dir / snap_filename
     
-    # 2. Package tar/gz into memory (or temp file for large sizes, but for now we buffer locally)
-    # Since files can be large, we stream tar straight into gzip into memory. For true large files, 
-    # we would stream directly to disk and encrypt in chunks, but AESGCM in cryptography requires 
-    # the whole payload. We will buffer to bytes for simplicity, up to available RAM.
-    # A true extreme-scale app uses STREAMING symmetric encryption, but standard AESGCM is one-shot.
-    # We will use one-shot as per standard python `cryptography` lib usage for AESGCM.
-    
+    # 2. Package, compress and encrypt in one streaming pass: tar -> gzip -> AES-GCM frames -> disk.
+    # Peak memory is one frame regardless of the size of the backup.
+    # The container hash is computed by _HashingWriter as the bytes are written,
+    # so uploaders never have to read the file back.
+    # tar stays as the archive layer even though its 512-byte headers cost space on trees of
+    # tiny files: a decrypted payload remains a plain .tar.gz that standard tools can inspect,
+    # and restore gets tarfile's member handling instead of a bespoke record parser.
     try:
-        buffer = io.BytesIO()
-        with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6) as gz:
-            with tarfile.open(fileobj=gz, mode="w") as tar:
-                # Add metadata JSON first so restore can preview it fast
-                meta_data = f'{{"snapshot_id": "{snap_id}", "parent": "{parent_id or ""}"}}'.encode("utf-8")
-                ti = tarfile.TarInfo(name=".tbk_meta.json")
-                ti.size = len(meta_data)
-                tar.addfile(ti, io.BytesIO(meta_data))
-                
-                # Add all files
-                for fp in fingerprints:
-                    tar.add(source_dir / fp.relative_path, arcname=fp.relative_path)
+        with tbk_path.open("wb") as fh:
+            f_out = _HashingWriter(fh)
+            f_out.write(HEADER.pack(MAGIC_BYTES, prefix))
             
-        payload = buffer.getvalue()
-        buffer.close()
-        
-        # 3. Encrypt payload
-        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-        aesgcm = AESGCM(dek)
-        # AESGCM.encrypt returns ciphertext + tag
-        encrypted_payload = aesgcm.encrypt(nonce, payload, None)
-        
-        # 4. Sign the package
-        signature = sign(encrypted_payload, signing_key_raw)
-        
-        # 5. Write .tbk file structure:
-        # [MAGIC 4] [NONCE 12] [SIG_LEN 2] [SIG ...] [ENCRYPTED_PAYLOAD]
-        sig_len = len(signature)
-        with tbk_path.open("wb") as f_out:
-            f_out.write(MAGIC_BYTES)
-            f_out.write(nonce)
-            f_out.write(sig_len.to_bytes(2, "big"))
+            frames = _FrameWriter(f_out, _aesgcm(dek), prefix)
+            with gzip.GzipFile(fileobj=frames, mode="wb", compresslevel=GZIP_COMPRESSLEVEL) as gz:
+                with _open_tar_stream(gz) as tar:
+                    # Add metadata JSON first so restore can preview it fast
+                    meta_json = f'{{"snapshot_id": "{snap_id}", "parent": "{parent_id or ""}"}}'
+                    meta_data = meta_json.encode("utf-8")
+                    ti = tarfile.TarInfo(name=".tbk_meta.json")
+                    ti.size = len(meta_data)
+                    tar.addfile(ti, io.BytesIO(meta_data))
+                    
+                    # Add all files
+                    _add_files(tar, str(source_dir), fingerprints)
+            frames.close()
+            
+            # 3. Sign the header and frames, then append the trailer
+            signature = sign(f_out.hasher.digest(), signing_key_raw)
             f_out.write(signature)
-            f_out.write(encrypted_payload)
+            f_out.write(len(signature).to_bytes(2, "big"))
             
         meta = SnapshotMeta(
             snapshot_id=snap_id,
@@ -125,7 +249,8 @@ def create_snapshot(
             file_count=file_count,
             total_size=total_size,
             salt_b64="", # Salt no longer needed on a per-snapshot level if DEK is used
-            nonce_b64=base64.b64encode(nonce).decode("ascii")
+            nonce_b64=base64.b64encode(prefix).decode("ascii"),
+            sha256=f_out.hasher.hexdigest()
         )
         return tbk_path, meta
         
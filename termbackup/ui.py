@@ -4,12 +4,13 @@ Provides cyberpunk aesthetics, neon gradients, unicode fallback.
 """
 import sys
 from contextlib import contextmanager
-from typing import Optional, List, Dict, Any
+from functools import cache
+from typing import Dict, Any, Iterable, Sequence, Tuple
 from pathlib import Path
 from typing import Generator
 
 import typer
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.progress import (
     BarColumn,
@@ -24,11 +25,12 @@ from rich import box
 from rich.text import Text
 from rich.tree import Tree
 
-# Detect ASCII fallback
+# Detect ASCII fallback. Encoding a sample is the real test: gb18030 has no "utf" in its
+# name but covers emoji, and cp1252 raises. Streams without an encoding fall back to UTF-8.
 try:
-    "📦".encode(sys.stdout.encoding if sys.stdout else "utf-8")
+    "📦".encode(getattr(sys.stdout, "encoding", None) or "utf-8")
     HAS_UNICODE = True
-except Exception:
+except (LookupError, UnicodeEncodeError):
     HAS_UNICODE = False
 
 ICONS: Dict[str, str] = {
@@ -69,14 +71,17 @@ ASCII_ICONS: Dict[str, str] = {
     "signature": "[SIG]"
 }
 
+_ACTIVE_ICONS: Dict[str, str] = ICONS if HAS_UNICODE else ASCII_ICONS
+
 def icon(name: str) -> str:
-    return ICONS.get(name, "") if HAS_UNICODE else ASCII_ICONS.get(name, "")
+    return _ACTIVE_ICONS.get(name, "")
 
 console = Console(width=120)
 err_console = Console(stderr=True, width=120)
 
-def render_banner() -> None:
-    """Render the TermBackup exact ASCII art cyberpunk banner."""
+@cache
+def _banner_panel() -> Panel:
+    """Build the banner once; every command prints the same panel."""
     # Using an exact exact Termbackup ASCII Art
     termbackup_ascii = r"""                                                                               
   _|_|_|_|_|                                  _|                            _|                          
@@ -93,18 +98,24 @@ def render_banner() -> None:
     banner_text.append(f"\n[  NEXUS MATRIX ENGINE v2.0 {i_delta} ZERO-TRUST CRYPTO VAULT  ]\n", style="bold cyan")
     banner_text.append("STATUS: ONLINE | ENCRYPTION: AES-256-GCM | SIGNATURE: Ed25519", style="dim magenta")
     
-    console.print(Panel(
+    return Panel(
         banner_text, 
         border_style="cyan", 
         expand=False, 
         title="[bold color(51)]SYSTEM INITIALIZATION[/]",
         title_align="left"
-    ))
+    )
+
+def render_banner() -> None:
+    """Render the TermBackup exact ASCII art cyberpunk banner."""
+    console.print(_banner_panel())
 
 def render_status(action: str, message: str, style: str = "white") -> None:
     """Print a single line status update."""
     i = icon(action)
-    console.print(f"{i} [{style}]{message}[/]")
+    # A prebuilt Text skips markup, emoji and highlighter passes, and paths containing '['
+    # print verbatim
+    console.print(Text.assemble(f"{i} ", (message, style)))
 
 def render_error(message: str) -> None:
     """Print a styled error panel."""
@@ -123,9 +134,8 @@ def confirm(prompt_text: str) -> bool:
     i = icon("warn")
     return typer.confirm(f"{i} {prompt_text}", default=False)
 
-def render_table(title: str, headers: list[str], rows: list[list[str]]) -> None:
+def render_table(title: str, headers: list[str], rows: Iterable[Sequence[str]]) -> None:
     """Render a structured Rich Table with auto-wrap fixes."""
-    console.print()
     table = Table(
         title=title, 
         border_style="cyan", 
@@ -142,22 +152,24 @@ def render_table(title: str, headers: list[str], rows: list[list[str]]) -> None:
     for r in rows:
         table.add_row(*r)
         
-    console.print(table)
-    console.print()
+    # Blank line, table, blank line in one layout pass
+    console.print(Group(Text(), table, Text()))
     
 def render_tree_from_paths(root_dir: str, paths: list[str]) -> Tree:
     """Render a Rich tree layout from a list of paths."""
     tree = Tree(f"[bold magenta]{root_dir}[/]")
+    # Directory prefix -> its node, so siblings share one parent branch
+    nodes: Dict[Tuple[str, ...], Tree] = {}
     
     for relative_path in paths:
         parts = Path(relative_path).parts
-        current_node = tree
-        for part in parts:
-            # This is a simplified linear attachment. For a true tree structure,
-            # you'd need to check if a node already exists before adding.
-            # For now, we just add the full path as a leaf.
-            pass # The original snippet had a pass here, implying simple attachment.
-        tree.add(relative_path) # Adding the full relative path as a leaf
+        parent = tree
+        for depth in range(1, len(parts) + 1):
+            prefix = parts[:depth]
+            node = nodes.get(prefix)
+            if node is None:
+                node = nodes[prefix] = parent.add(Text(parts[depth - 1]))
+            parent = node
         
     return tree
 
@@ -168,18 +180,21 @@ def render_diff(delta: Any) -> None:
         console.print("[dim italic]No changes detected between snapshot and target directory.[/]")
         return
         
-    if delta.added:
-        console.print("[bold green]Added:[/]")
-        for p in delta.added:
-            console.print(f"  [green]+[/] {p}")
-    if delta.modified:
-        console.print("[bold yellow]Modified:[/]")
-        for p in delta.modified:
-            console.print(f"  [yellow]~[/] {p}")
-    if delta.deleted:
-        console.print("[bold red]Deleted:[/]")
-        for p in delta.deleted:
-            console.print(f"  [red]-[/] {p}")
+    # One Text and one print: per-line console.print calls dominate on large deltas
+    text = Text()
+    for label, marker, style, entries in (
+        ("Added", "+", "green", delta.added),
+        ("Modified", "~", "yellow", delta.modified),
+        ("Deleted", "-", "red", delta.deleted),
+    ):
+        if not entries:
+            continue
+        text.append(f"{label}:\n", style=f"bold {style}")
+        for entry in entries:
+            text.append(f"  {marker}", style=style)
+            text.append(f" {entry.relative_path}\n")
+    text.rstrip()
+    console.print(text)
             
 def render_success_summary(title: str, stats: dict) -> None:
     """Render a clean summary panel for operations."""
@@ -8,11 +8,23 @@ import shutil
 import signal
 import sys
 import tempfile
+import threading
 import time
 from contextlib import contextmanager
+from functools import cache
 from pathlib import Path
 from typing import Any, Callable, Generator
 
+from .errors import PathTraversalError
+
+HASH_BUFFER_SIZE = 1 << 20
+SHRED_CHUNK_SIZE = 1 << 20
+SIZE_SUFFIXES = ("B", "KiB", "MiB", "GiB", "TiB", "PiB")
+# statfs(2) f_type values: btrfs, ZFS, bcachefs
+COW_FS_MAGICS = frozenset({0x9123683E, 0x2FC12FC1, 0xCA451A4E})
+
+_HASH_LOCAL = threading.local()
+
 
 def is_windows() -> bool:
     """Return True if running on Windows."""
@@ -24,15 +36,43 @@ def mask_token(token: str) -> str:
         return "****"
     return "*" * (len(token) - 4) + token[-4:]
 
+@cache
+def _libc() -> Any:
+    return ctypes.CDLL(None, use_errno=True)
+
+def _is_copy_on_write(path: Path) -> bool:
+    """Return True if path lives on a Linux copy-on-write filesystem (btrfs, ZFS, bcachefs)."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        # struct statfs is 120 bytes on 64-bit Linux; f_type is its leading word
+        buf = ctypes.create_string_buffer(256)
+        if _libc().statfs(os.fsencode(path), buf) != 0:
+            return False
+        f_type = ctypes.c_long.from_buffer(buf).value & 0xFFFFFFFF
+    except (OSError, AttributeError):
+        return False
+    return f_type in COW_FS_MAGICS
+
 def secure_shred_file(path: Path) -> None:
-    """Securely overwrite and remove a file."""
+    """
+    Securely overwrite and remove a file.
+    On copy-on-write filesystems the rewrite would land on fresh blocks and leave
+    the originals untouched, so the file is only unlinked there.
+    """
     if not path.is_file():
         return
     try:
+        if _is_copy_on_write(path):
+            return
         size = path.stat().st_size
-        with path.open("wb") as f:
-            # Overwrite with random bytes
-            f.write(os.urandom(size))
+        # One random block reused across the file keeps memory at SHRED_CHUNK_SIZE
+        noise = memoryview(os.urandom(min(size, SHRED_CHUNK_SIZE)))
+        # r+b overwrites the existing blocks in place; wb would truncate first
+        with path.open("r+b") as f:
+            remaining = size
+            while remaining > 0:
+                remaining -= f.write(noise[:remaining])
             f.flush()
             os.fsync(f.fileno())
     except Exception:
@@ -65,38 +105,73 @@ def validate_path(path: str | Path, base_dir: str | Path) -> Path:
     """
     Resolve a path and ensure it falls strictly under the base_dir to prevent directory traversal.
     """
-    resolved_path = Path(path).resolve()
-    resolved_base = Path(base_dir).resolve()
+    # String realpath avoids the intermediate Path objects of Path.resolve on the restore hot path
+    resolved_path = os.path.realpath(path)
+    resolved_base = os.path.realpath(base_dir)
     
-    if not str(resolved_path).startswith(str(resolved_base)):
-        from .errors import PathTraversalError
+    # Compare against base + separator: a bare prefix check would let
+    # /data/backup-evil pass for /data/backup
+    inside = resolved_path.startswith(os.path.join(resolved_base, ""))
+    if resolved_path != resolved_base and not inside:
         raise PathTraversalError(f"Path '{path}' escapes base directory '{base_dir}'.")
-    return resolved_path
+    return Path(resolved_path)
+
+def _hash_buffer() -> memoryview:
+    """Return this thread's reusable read buffer for file hashing."""
+    view = getattr(_HASH_LOCAL, "view", None)
+    if view is None:
+        view = _HASH_LOCAL.view = memoryview(bytearray(HASH_BUFFER_SIZE))
+    return view
+
+def _open_for_hashing(path: Path) -> int:
+    """
+    Open a file read-only, skipping the atime update where the OS allows it,
+    and hint the kernel that it will be read front to back.
+    """
+    flags = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+    noatime = getattr(os, "O_NOATIME", 0)
+    fd = -1
+    if noatime:
+        try:
+            fd = os.open(path, flags | noatime)
+        except PermissionError:
+            pass  # O_NOATIME needs file ownership
+    if fd < 0:
+        fd = os.open(path, flags)
+    if hasattr(os, "posix_fadvise"):
+        try:
+            # Linux doubles the readahead window for sequential access
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    return fd
 
 def sha256_file(path: Path) -> str:
     """Stream a file and return its SHA-256 hex digest."""
     hasher = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(65536), b""):
-            hasher.update(chunk)
+    buf = _hash_buffer()
+    # Unbuffered reads straight into the per-thread buffer: no allocation per chunk.
+    # This is the same readinto loop hashlib.file_digest runs in Python, minus
+    # its fresh 256 KiB buffer per call.
+    with open(_open_for_hashing(path), "rb", buffering=0) as f:
+        while n := f.readinto(buf):
+            hasher.update(buf[:n])
     return hasher.hexdigest()
 
 def human_size(nbytes: int) -> str:
     """Convert bytes to a human-readable string (e.g. 1.2 MiB)."""
-    if nbytes == 0:
-        return "0 B"
-    suffixes = ["B", "KiB", "MiB", "GiB", "TiB", "PiB"]
-    i = 0
-    while nbytes >= 1024 and i < len(suffixes) - 1:
-        nbytes /= 1024.0  # type: ignore
-        i += 1
-    if i == 0:
-        return f"{int(nbytes)} {suffixes[i]}"
-    return f"{nbytes:.1f} {suffixes[i]}"
+    if nbytes < 1024:
+        return f"{int(nbytes)} B"
+    # Every 10 bits is one 1024x step
+    i = min((int(nbytes).bit_length() - 1) // 10, len(SIZE_SUFFIXES) - 1)
+    return f"{nbytes / (1 << (10 * i)):.1f} {SIZE_SUFFIXES[i]}"
 
 def timestamp_id() -> str:
-    """Return a YYYYMMDD_HHMMSS formatted string."""
-    return time.strftime("%Y%m%d_%H%M%S")
+    """
+    Return the current UTC time as YYYYMMDD_HHMMSS.
+    UTC keeps IDs increasing across DST changes and matches the manifest's uploaded_at.
+    """
+    return time.strftime("%Y%m%d_%H%M%S", time.gmtime())
 
 def setup_signal_handlers(cleanup_fn: Callable[[], None]) -> None:
     """Install SIGINT/SIGTERM handlers that invoke the cleanup function and exit."""
@@ -111,10 +186,14 @@ def setup_signal_handlers(cleanup_fn: Callable[[], None]) -> None:
 def zero_memory(data: bytearray | memoryview) -> None:
     """Best-effort to zero-out sensitive memory buffers."""
     try:
-        if isinstance(data, bytearray):
-            ctypes.memset(id(data) + 16, 0, len(data))  # Rough CPython struct offset
-        elif isinstance(data, memoryview):
-            for i in range(len(data)):
-                data[i] = 0
+        size = data.nbytes if isinstance(data, memoryview) else len(data)
+        if not size:
+            return
+        # One memset over the object's own buffer (bytearray storage lives behind
+        # a pointer, not at a fixed offset from id()). Read-only or non-contiguous
+        # buffers are refused by from_buffer and left alone.
+        view = (ctypes.c_char * size).from_buffer(data)
+        ctypes.memset(view, 0, size)
+        del view  # release the buffer export so the bytearray can be resized again
     except Exception:
         pass
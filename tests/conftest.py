@@ -0,0 +1,10 @@
+import pytest
+
+from termbackup.config import get_config_dir
+
+
+@pytest.fixture
+def config_home(tmp_path, monkeypatch):
+    """Point XDG_CONFIG_HOME at a per-test directory and return the termbackup config dir."""
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    return get_config_dir()
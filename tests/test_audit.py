@@ -0,0 +1,65 @@
+import pytest
+
+from termbackup import audit
+from termbackup.audit import get_audit_log, get_audit_logger
+
+
+@pytest.fixture
+def config_home(config_home, monkeypatch):
+    monkeypatch.setattr(audit, "_LOGGER", None)
+    audit._audit_path.cache_clear()
+    audit._fallback_path.cache_clear()
+    yield config_home
+    if audit._LOGGER is not None:
+        audit._LOGGER.close()
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_audit_roundtrip(config_home, monkeypatch, use_orjson: bool):
+    if not use_orjson:
+        monkeypatch.setattr(audit, "orjson", None)
+
+    logger = get_audit_logger()
+    logger.log("snapshot_start", profile="work", password="hunter2", github_token="ghp_x")
+    logger.log("snapshot_end", profile="work", status="success")
+
+    events = get_audit_log()
+    assert [e["event"] for e in events] == ["snapshot_start", "snapshot_end"]
+    assert events[0]["details"] == {
+        "profile": "work", "password": "*****", "github_token": "*****"
+    }
+    assert events[0]["timestamp"].endswith("+00:00")
+
+def test_audit_last_n(config_home):
+    logger = get_audit_logger()
+    for i in range(10):
+        logger.log("tick", n=i)
+
+    events = get_audit_log(last_n=3)
+    assert [e["details"]["n"] for e in events] == [7, 8, 9]
+
+def test_audit_missing_log(config_home):
+    assert get_audit_log() == []
+
+def test_audit_sync_mode(config_home, monkeypatch):
+    monkeypatch.setenv("TERMBACKUP_SYNC_AUDIT", "1")
+    logger = get_audit_logger()
+    logger.log("tick", n=0)
+
+    assert logger._worker is None
+    assert len(get_audit_log()) == 1
+
+def test_audit_tail_spans_blocks(config_home, monkeypatch):
+    monkeypatch.setattr(audit, "TAIL_BLOCK_SIZE", 64)
+    logger = get_audit_logger()
+    for i in range(40):
+        logger.log("tick", n=i)
+
+    events = get_audit_log(last_n=5)
+    assert [e["details"]["n"] for e in events] == [35, 36, 37, 38, 39]
+    assert len(get_audit_log(last_n=100)) == 40
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_format_details(monkeypatch, use_orjson: bool):
+    if not use_orjson:
+        monkeypatch.setattr(audit, "orjson", None)
+    assert audit.format_details({"profile": "work", "n": 1}) == '{"profile":"work","n":1}'
@@ -0,0 +1,92 @@
+import stat
+import sys
+from datetime import datetime, timezone
+from unittest import mock
+
+import pytest
+
+from termbackup import config
+from termbackup.config import (
+    get_config_dir,
+    get_tokens_bulk,
+    list_profiles,
+    load_profile,
+    update_profile,
+)
+from termbackup.errors import ProfileNotFoundError, ProfileValidationError
+from termbackup.models import Profile
+
+
+def test_list_profiles(config_home):
+    for name in ["work.json", "home.json", "config.json", ".hidden.json", "notes.txt"]:
+        (config_home / name).write_text("{}")
+    (config_home / "dir.json").mkdir()
+
+    assert list_profiles() == ["home", "work"]
+
+def test_profile_roundtrip(config_home):
+    profile = Profile(
+        name="work",
+        source_dir="/tmp/src",
+        repo="user/repo",
+        token_ref="termbackup_work_token",
+        created_at=datetime.now(timezone.utc),
+        master_key_enc="a",
+        master_key_salt="b",
+        recovery_key_enc="c",
+        recovery_key_salt="d",
+    )
+    update_profile(profile)
+    assert load_profile("work") == profile
+    if sys.platform != "win32":
+        assert stat.S_IMODE((config_home / "work.json").stat().st_mode) == 0o600
+    assert list(config_home.glob(".*.tmp")) == []
+
+    # Unchanged files reuse the parsed profile; rewrites are picked up
+    assert load_profile("work") is load_profile("work")
+    updated = profile.model_copy(update={"source_dir": "/tmp/other"})
+    update_profile(updated)
+    assert load_profile("work").source_dir == "/tmp/other"
+
+def test_load_profile_errors(config_home):
+    with pytest.raises(ProfileNotFoundError):
+        load_profile("missing")
+    (config_home / "broken.json").write_text("{not json")
+    with pytest.raises(ProfileValidationError):
+        load_profile("broken")
+
+def test_config_dir_follows_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "a"))
+    first = get_config_dir()
+    assert get_config_dir() is first
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "b"))
+    assert get_config_dir() == tmp_path / "b" / "termbackup"
+    assert get_config_dir().is_dir()
+
+def test_get_tokens_bulk(monkeypatch):
+    monkeypatch.setattr(
+        config, "get_profile_token", lambda p: None if p.name == "b" else f"tok-{p.name}"
+    )
+    profiles = [mock.Mock(spec=["name"]) for _ in range(3)]
+    for p, name in zip(profiles, "abc", strict=True):
+        p.name = name
+
+    assert get_tokens_bulk(profiles) == {"a": "tok-a", "b": None, "c": "tok-c"}
+    assert get_tokens_bulk([]) == {}
+
+@pytest.mark.parametrize("repo", ["user/repo\n", "user", "user/repo/extra", "us er/repo"])
+def test_profile_rejects_bad_repo(repo):
+    from pydantic import ValidationError
+
+    with pytest.raises(ValidationError):
+        Profile(
+            name="work",
+            source_dir="/tmp/src",
+            repo=repo,
+            token_ref="termbackup_work_token",
+            created_at=datetime.now(timezone.utc),
+            master_key_enc="a",
+            master_key_salt="b",
+            recovery_key_enc="c",
+            recovery_key_salt="d",
+        )
@@ -1,32 +1,49 @@
+import os
+from unittest import mock
+
 import pytest
-from hypothesis import given, settings, strategies as st
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
 from termbackup.crypto import (
-    generate_salt,
+    DecryptionError,
+    EncryptionError,
+    KeyDerivationError,
+    clear_key_cache,
+    compute_sha256,
+    compute_sha256_path,
+    decrypt,
     derive_key,
+    derive_recovery_key,
     encrypt,
-    decrypt,
+    encrypt_many,
     generate_recovery_phrase,
-    derive_recovery_key,
+    generate_salt,
     generate_signing_keypair,
+    secure_compare_hex,
     sign,
     verify,
-    DecryptionError,
-    SignatureError
 )
 
-@settings(max_examples=50, deadline=None)
-@given(
-    password=st.text(min_size=8, max_size=64),
-    data=st.binary(min_size=1, max_size=1024)
-)
-def test_crypto_roundtrip(password: str, data: bytes):
+# Argon2 costs ~0.2s per derivation, so the KDF and the AEAD get separate properties:
+# a few passwords through the real KDF, many payloads under one fixed key.
+ROUNDTRIP_KEY = os.urandom(32)
+
+@settings(max_examples=10, deadline=None)
+@given(password=st.text(min_size=8, max_size=64))
+def test_derived_key_roundtrip(password: str):
     salt = generate_salt()
     key = derive_key(password, salt)
-    
-    encrypted = encrypt(data, key)
+    assert len(key) == 32
+    assert decrypt(encrypt(b"payload", key), key) == b"payload"
+
+@settings(max_examples=200, deadline=None)
+@given(data=st.binary(min_size=1, max_size=1024))
+def test_crypto_roundtrip(data: bytes):
+    encrypted = encrypt(data, ROUNDTRIP_KEY)
     assert encrypted != data
     
-    decrypted = decrypt(encrypted, key)
+    decrypted = decrypt(encrypted, ROUNDTRIP_KEY)
     assert decrypted == data
 
 def test_wrong_password_fails():
@@ -45,6 +62,16 @@ def test_recovery_phrase_generation():
     words = phrase.split()
     assert len(words) == 24
 
+def test_recovery_key_kdf_selection():
+    phrase = generate_recovery_phrase()
+    salt = generate_salt()
+
+    # Profiles without a recorded recovery KDF keep the password parameters
+    assert derive_recovery_key(phrase, salt, None) == derive_key(phrase, salt)
+    assert derive_recovery_key(phrase, salt) != derive_key(phrase, salt)
+    with pytest.raises(KeyDerivationError):
+        derive_recovery_key(phrase, salt, "scrypt")
+
 def test_signing_verification():
     priv, pub = generate_signing_keypair()
     data = b"important_metadata"
@@ -59,3 +86,57 @@ def test_signing_verification():
     bad_sig = bytearray(signature)
     bad_sig[0] ^= 0xFF
     assert verify(data, bytes(bad_sig), pub) is False
+
+def test_signing_keys_are_cached():
+    clear_key_cache()
+    priv, pub = generate_signing_keypair()
+    assert verify(b"first", sign(b"first", priv), pub)
+
+    with (
+        mock.patch("termbackup.crypto.ed25519.Ed25519PrivateKey.from_private_bytes") as load_priv,
+        mock.patch("termbackup.crypto.ed25519.Ed25519PublicKey.from_public_bytes") as load_pub,
+    ):
+        assert verify(b"second", sign(b"second", priv), pub)
+    load_priv.assert_not_called()
+    load_pub.assert_not_called()
+
+def test_derive_key_cache():
+    clear_key_cache()
+    salt = generate_salt()
+    key = derive_key("cached_password", salt)
+
+    with mock.patch("termbackup.crypto.hash_secret_raw") as kdf:
+        assert derive_key("cached_password", salt) == key
+        kdf.assert_not_called()
+
+    clear_key_cache()
+    assert derive_key("cached_password", salt) == key
+    assert derive_key("cached_password", generate_salt()) != key
+
+def test_compute_sha256_path(tmp_path):
+    data = os.urandom(3 * 1024 * 1024 + 11)
+    path = tmp_path / "blob.bin"
+    path.write_bytes(data)
+    assert compute_sha256_path(path) == compute_sha256(data)
+
+def test_encrypt_many():
+    key1, key2 = os.urandom(32), os.urandom(32)
+    items = [(b"one", key1), (b"two", key2), (b"three", key1)]
+    out = encrypt_many(items)
+
+    decrypted = [decrypt(payload, key) for payload, (_, key) in zip(out, items, strict=True)]
+    assert decrypted == [b"one", b"two", b"three"]
+    assert len({payload[:12] for payload in out}) == 3
+
+    nonces = os.urandom(36)
+    used = [payload[:12] for payload in encrypt_many(items, nonces)]
+    assert used == [nonces[:12], nonces[12:24], nonces[24:]]
+    with pytest.raises(EncryptionError):
+        encrypt_many(items, nonces[:24])
+
+def test_secure_compare_hex():
+    digest = compute_sha256(b"payload")
+    assert secure_compare_hex(digest, digest.upper())
+    assert not secure_compare_hex(digest, compute_sha256(b"other"))
+    assert not secure_compare_hex(digest, digest[:-2])
+    assert not secure_compare_hex(digest, "zz" + digest[2:])
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+from termbackup.daemon import DaemonProcess, _pid_alive, _try_lock, _unlock
+
+
+def test_pid_alive():
+    assert _pid_alive(os.getpid())
+
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    child.wait()
+    assert not _pid_alive(child.pid)
+
+def test_is_running_clears_stale_pid_file(config_home):
+    daemon = DaemonProcess("work", 60)
+    assert not daemon.is_running()
+
+    daemon.pid_file.write_text(str(os.getpid()))
+    assert daemon.is_running()
+
+    daemon.pid_file.write_text("not-a-pid")
+    assert not daemon.is_running()
+    assert not daemon.pid_file.exists()
+
+def test_lock_file_decides_is_running(config_home):
+    daemon = DaemonProcess("work", 60)
+    fd = os.open(daemon.lock_file, os.O_RDWR | os.O_CREAT)
+    try:
+        assert _try_lock(fd)
+        assert daemon.is_running()
+
+        _unlock(fd)
+        daemon.pid_file.write_text(str(os.getpid()))
+        assert not daemon.is_running()
+        assert not daemon.pid_file.exists()
+    finally:
+        os.close(fd)
+
+def test_github_client_reused_across_runs(config_home):
+    daemon = DaemonProcess("work", 60)
+    first = daemon._github("token-a")
+    assert daemon._github("token-a") is first
+
+    second = daemon._github("token-b")
+    assert second is not first
+    assert first._client.is_closed
+
+    daemon.stop()
+    assert second._client.is_closed
@@ -0,0 +1,95 @@
+import os
+from unittest import mock
+
+from termbackup import delta
+from termbackup.config import get_fingerprint_cache_path
+from termbackup.crypto import compute_sha256
+from termbackup.delta import compute_delta, scan_directory, should_compress
+from termbackup.models import FileFingerprint
+
+
+def _fp(path: str, sha: str) -> FileFingerprint:
+    return FileFingerprint(relative_path=path, sha256=sha, size=1, mtime=0.0)
+
+def test_compute_delta():
+    current = [_fp("a.txt", "1"), _fp("b.txt", "2"), _fp("c.txt", "3"), _fp("e.txt", "5")]
+    parent = [_fp("b.txt", "2"), _fp("c.txt", "x"), _fp("d.txt", "4"), _fp("f.txt", "6")]
+
+    delta = compute_delta(current, parent)
+
+    def names(fps):
+        return [fp.relative_path for fp in fps]
+
+    assert names(delta.added) == ["a.txt", "e.txt"]
+    assert names(delta.modified) == ["c.txt"]
+    assert names(delta.unchanged) == ["b.txt"]
+    assert names(delta.deleted) == ["d.txt", "f.txt"]
+
+def test_compute_delta_without_parent():
+    current = [_fp("a.txt", "1")]
+    assert compute_delta(current, None).added == current
+
+def test_scan_directory(tmp_path, monkeypatch, config_home):
+    monkeypatch.setattr(delta, "SCAN_CHUNK_SIZE", 2)
+    tmp_path = tmp_path / "src"
+    tmp_path.mkdir()
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "node_modules").mkdir()
+    for name in ["b.txt", "a.txt", "sub/c.txt", "sub/d.log", "node_modules/x.js"]:
+        (tmp_path / name).write_text(name)
+
+    fps = scan_directory(tmp_path, ["node_modules", ".log"])
+
+    assert [fp.relative_path for fp in fps] == ["a.txt", "b.txt", "sub/c.txt"]
+    assert fps[0].sha256 == compute_sha256(b"a.txt")
+    assert fps[0].size == 5
+
+def test_scan_directory_reuses_cached_hashes(tmp_path, config_home):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "same.txt").write_text("same")
+    (src / "edited.txt").write_text("before")
+    first = {fp.relative_path: fp.sha256 for fp in scan_directory(src, [])}
+
+    (src / "edited.txt").write_text("after!")
+    hashed = []
+    real = delta.sha256_file
+
+    def spy(p):
+        hashed.append(p.name)
+        return real(p)
+
+    with mock.patch.object(delta, "sha256_file", side_effect=spy):
+        second = {fp.relative_path: fp.sha256 for fp in scan_directory(src, [])}
+
+    if os.name != "nt":
+        assert hashed == ["edited.txt"]
+    assert second["same.txt"] == first["same.txt"]
+    assert second["edited.txt"] == compute_sha256(b"after!")
+
+def test_should_compress():
+    assert should_compress("notes.txt")
+    assert should_compress("archive.zip/readme")
+    assert should_compress(".gz")
+    assert not should_compress("photos/IMG_0001.JPG")
+    assert not should_compress("backup.tar.gz")
+
+def test_hash_cache_is_scoped_and_pruned(tmp_path, config_home):
+    first, second = tmp_path / "one", tmp_path / "two"
+    for src in (first, second):
+        src.mkdir()
+        (src / "keep.txt").write_text("keep")
+        (src / "gone.txt").write_text("gone")
+        scan_directory(src, [])
+
+    (first / "gone.txt").unlink()
+    scan_directory(first, [])
+
+    db_path = get_fingerprint_cache_path()
+    assert len(delta._load_hash_cache(db_path, str(first.resolve()))) == 1
+    assert len(delta._load_hash_cache(db_path, str(second.resolve()))) == 2
+
+def test_scan_without_cache_leaves_no_database(tmp_path, config_home):
+    (tmp_path / "a.txt").write_text("a")
+    scan_directory(tmp_path, [], use_cache=False)
+    assert not get_fingerprint_cache_path().exists()
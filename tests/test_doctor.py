@@ -0,0 +1,51 @@
+from unittest import mock
+
+from termbackup import doctor
+
+
+def test_run_diagnostics_without_profiles(config_home):
+    with mock.patch.object(doctor.httpx, "get") as get:
+        checks = doctor.run_diagnostics()
+
+    get.assert_called_once()
+    assert [c.name.split(".")[0] for c in checks] == [str(i) for i in range(1, 13)]
+    by_name = {c.name: c for c in checks}
+    assert by_name["1. GitHub Token Validation"].status == "warn"
+    assert by_name["3. Network Latency"].status in ("pass", "warn")
+    assert by_name["7. Profile Schema"].detail == "0 profiles valid"
+    assert by_name["10. Manifest Integrity"].detail == "Skipped"
+
+def test_rate_limit_reuses_validation_headers():
+    import httpx
+
+    from termbackup.github import GitHubClient
+
+    paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        headers = {"X-RateLimit-Remaining": "4999", "X-RateLimit-Limit": "5000"}
+        return httpx.Response(200, json={}, headers=headers)
+
+    client = GitHubClient("ghp_test")
+    client._client = httpx.Client(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    checks = doctor._check_github(client)
+
+    assert paths == ["/user"]
+    assert client.last_rate == (4999, 5000)
+    assert client.validate_token().rate_remaining == 4999
+    assert checks[1].status == "pass"
+    assert checks[1].detail == "4999 requests remaining"
+
+def test_engine_reports_missing_distribution(monkeypatch):
+    monkeypatch.setattr(doctor, "CORE_DISTRIBUTIONS", ("pydantic", "not-a-real-dist"))
+    checks = doctor._check_engine()
+    assert checks[1].status == "fail"
+    assert checks[1].detail == "Missing: not-a-real-dist"
+
+def test_manifest_check_without_manifest():
+    client = mock.Mock()
+    client.download_manifest.return_value = None
+    profile = mock.Mock(repo="owner/vault")
+    [check] = doctor._check_manifest(client, profile)
+    assert (check.status, check.detail) == ("warn", "No manifest yet")
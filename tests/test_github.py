@@ -0,0 +1,237 @@
+import base64
+import json
+import os
+from pathlib import Path
+
+import httpx
+import pytest
+
+from termbackup.crypto import compute_sha256
+from termbackup.errors import UploadError
+from termbackup.github import B64_CHUNK_SIZE, GitHubClient, _FileContentBody
+from termbackup.manifest import create_initial_manifest, serialize_manifest
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, B64_CHUNK_SIZE, B64_CHUNK_SIZE * 3 + 5])
+def test_file_content_body_streams_base64(tmp_path: Path, size: int):
+    data = os.urandom(size)
+    path = tmp_path / "snapshot.tbk"
+    path.write_bytes(data)
+
+    body = _FileContentBody({"message": "Add snapshot", "sha": "abc"}, path)
+    raw = b"".join(body)
+
+    assert len(raw) == body.content_length
+    payload = json.loads(raw)
+    assert payload["sha"] == "abc"
+    assert base64.b64decode(payload["content"]) == data
+    # The body must be replayable for retries
+    assert b"".join(body) == raw
+
+def _client_with(handler) -> GitHubClient:
+    client = GitHubClient("ghp_test")
+    client._client = httpx.Client(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    return client
+
+def test_download_file_stream(tmp_path: Path):
+    data = os.urandom(3 * 1024 * 1024 + 7)
+    client = _client_with(lambda request: httpx.Response(200, content=data))
+
+    dest = tmp_path / "snapshot.tbk"
+    client.download_file_stream("user/repo", "snapshots/snapshot.tbk", dest, compute_sha256(data))
+    assert dest.read_bytes() == data
+
+    with pytest.raises(UploadError):
+        client.download_file_stream("user/repo", "snapshots/snapshot.tbk", dest, "0" * 64)
+    assert not dest.exists()
+
+def test_download_file_stream_missing(tmp_path: Path):
+    client = _client_with(lambda request: httpx.Response(404))
+    with pytest.raises(FileNotFoundError):
+        client.download_file_stream("user/repo", "snapshots/missing.tbk", tmp_path / "x.tbk")
+
+def test_commit_files_single_commit(tmp_path: Path):
+    snapshot = tmp_path / "snapshot.tbk"
+    snapshot.write_bytes(b"encrypted")
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        calls.append((request.method, path))
+        if path == "/repos/user/repo":
+            return httpx.Response(200, json={"default_branch": "main"})
+        if path == "/repos/user/repo/git/ref/heads/main":
+            return httpx.Response(200, json={"object": {"sha": "parent"}})
+        if path == "/repos/user/repo/git/commits/parent":
+            return httpx.Response(200, json={"tree": {"sha": "base"}})
+        if path == "/repos/user/repo/git/blobs":
+            content = base64.b64decode(json.loads(request.read())["content"])
+            return httpx.Response(201, json={"sha": compute_sha256(content)})
+        if path == "/repos/user/repo/git/trees":
+            body = json.loads(request.read())
+            assert body["base_tree"] == "base"
+            assert [e["path"] for e in body["tree"]] == ["snapshots/snapshot.tbk", "manifest.json"]
+            assert body["tree"][0]["sha"] == compute_sha256(b"encrypted")
+            return httpx.Response(201, json={"sha": "tree"})
+        if path == "/repos/user/repo/git/commits":
+            assert json.loads(request.read())["parents"] == ["parent"]
+            return httpx.Response(201, json={"sha": "commit"})
+        if path == "/repos/user/repo/git/refs/heads/main":
+            assert json.loads(request.read()) == {"sha": "commit"}
+            return httpx.Response(200, json={})
+        return httpx.Response(500)
+
+    client = _client_with(handler)
+    client.commit_files(
+        "user/repo",
+        [("snapshots/snapshot.tbk", snapshot), ("manifest.json", b"{}")],
+        "Add snapshot",
+    )
+    assert calls[-1] == ("PATCH", "/repos/user/repo/git/refs/heads/main")
+    assert not any(path.startswith("/repos/user/repo/contents") for _, path in calls)
+
+def test_download_manifest_etag_cache(tmp_path: Path):
+    manifest = serialize_manifest(create_initial_manifest())
+    seen_etags = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_etags.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=manifest, headers={"ETag": '"v1"'})
+
+    client = _client_with(handler)
+    cache_file = tmp_path / "cache" / "work.manifest.json"
+
+    assert client.download_manifest("user/repo", cache_file) is not None
+    assert cache_file.read_bytes() == manifest
+    assert client.download_manifest("user/repo", cache_file) is not None
+    assert seen_etags == [None, '"v1"']
+
+def test_upload_file_reuses_cached_sha():
+    calls = []
+    remote = {"sha": None}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        if request.method == "GET":
+            if remote["sha"] is None:
+                return httpx.Response(404)
+            return httpx.Response(200, json={"sha": remote["sha"]})
+        sent = json.loads(request.read()).get("sha")
+        if sent != remote["sha"]:
+            return httpx.Response(409, json={"message": "sha mismatch"})
+        remote["sha"] = f"v{len(calls)}"
+        return httpx.Response(201, json={"content": {"sha": remote["sha"]}})
+
+    client = _client_with(handler)
+    client.upload_file("user/repo", "manifest.json", b"{}", "Update manifest")
+    client.upload_file("user/repo", "manifest.json", b"{}", "Update manifest")
+    assert calls == ["GET", "PUT", "PUT"]
+
+    # Someone else updated the file: the stale SHA is dropped and looked up again
+    remote["sha"] = "external"
+    calls.clear()
+    client.upload_file("user/repo", "manifest.json", b"{}", "Update manifest")
+    assert calls == ["PUT", "GET", "PUT"]
+
+def test_publish_snapshot_uses_release_asset(tmp_path: Path):
+    snapshot = tmp_path / "snapshot_1.tbk"
+    snapshot.write_bytes(b"encrypted" * 1000)
+    calls = []
+    uploaded = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        host, path = request.url.host, request.url.path
+        calls.append((request.method, host, path))
+        if path == "/repos/user/repo/releases/tags/termbackup-snapshots":
+            return httpx.Response(404)
+        if path == "/repos/user/repo/releases":
+            return httpx.Response(201, json={"id": 7})
+        if host == "uploads.github.com":
+            uploaded[request.url.params["name"]] = request.read()
+            assert request.headers["Content-Type"] == "application/octet-stream"
+            return httpx.Response(201, json={"id": 99})
+        if path == "/repos/user/repo":
+            return httpx.Response(200, json={"default_branch": "main"})
+        if path == "/repos/user/repo/git/ref/heads/main":
+            return httpx.Response(200, json={"object": {"sha": "parent"}})
+        if path == "/repos/user/repo/git/commits/parent":
+            return httpx.Response(200, json={"tree": {"sha": "base"}})
+        if path == "/repos/user/repo/git/blobs":
+            return httpx.Response(201, json={"sha": "blob"})
+        if path == "/repos/user/repo/git/trees":
+            tree = json.loads(request.read())["tree"]
+            assert [entry["path"] for entry in tree] == ["manifest.json"]
+            return httpx.Response(201, json={"sha": "tree"})
+        if path == "/repos/user/repo/git/commits":
+            return httpx.Response(201, json={"sha": "commit"})
+        return httpx.Response(200, json={})
+
+    client = _client_with(handler)
+    client.publish_snapshot("user/repo", snapshot, create_initial_manifest(), "Add snapshot")
+    # Raw bytes, no base64 wrapping
+    assert uploaded == {"snapshot_1.tbk": snapshot.read_bytes()}
+    assert calls[-1][0] == "PATCH"
+
+def test_download_snapshot_prefers_release_asset(tmp_path: Path):
+    data = os.urandom(4096)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/repos/user/repo/releases/tags/termbackup-snapshots":
+            return httpx.Response(200, json={"id": 7})
+        if path == "/repos/user/repo/releases/7/assets":
+            return httpx.Response(200, json=[{"name": "new.tbk", "id": 5}])
+        if path == "/repos/user/repo/releases/assets/5":
+            assert request.headers["Accept"] == "application/octet-stream"
+            return httpx.Response(200, content=data)
+        if path == "/repos/user/repo/contents/snapshots/old.tbk":
+            return httpx.Response(200, content=data[::-1])
+        return httpx.Response(404)
+
+    client = _client_with(handler)
+    client.download_snapshot("user/repo", "new.tbk", tmp_path / "new.tbk", compute_sha256(data))
+    assert (tmp_path / "new.tbk").read_bytes() == data
+    # Snapshots committed before release storage still come from snapshots/
+    client.download_snapshot("user/repo", "old.tbk", tmp_path / "old.tbk")
+    assert (tmp_path / "old.tbk").read_bytes() == data[::-1]
+
+def test_request_backoff_and_rate_limit_wait(monkeypatch):
+    from termbackup import github
+    from termbackup.errors import RateLimitError
+
+    sleeps = []
+    monkeypatch.setattr(github.time, "sleep", sleeps.append)
+    responses = iter([
+        httpx.Response(502),
+        httpx.Response(403, headers={"Retry-After": "2"}),
+        httpx.Response(200, json={}),
+    ])
+    client = _client_with(lambda request: next(responses))
+    assert client._request("GET", "/user").status_code == 200
+    assert github.RETRY_BASE_WAIT <= sleeps[0] <= github.RETRY_BASE_WAIT * 3
+    assert sleeps[1] == 2.0
+
+    # A reset too far away is raised instead of slept through
+    far = str(int(github.time.time()) + 3600)
+    client = _client_with(lambda request: httpx.Response(
+        403, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": far}
+    ))
+    with pytest.raises(RateLimitError):
+        client._request("GET", "/user")
+
+def test_download_manifest_reuses_parsed_manifest():
+    manifest = serialize_manifest(create_initial_manifest())
+    seen_etags = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_etags.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=manifest, headers={"ETag": '"v1"'})
+
+    client = _client_with(handler)
+    first = client.download_manifest("user/repo")
+    assert client.download_manifest("user/repo") is first
+    assert seen_etags == [None, '"v1"']
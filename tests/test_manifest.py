@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+
+from termbackup.manifest import append_entry, create_initial_manifest, verify_integrity
+from termbackup.models import ManifestEntry
+
+
+def _entry(snapshot_id: str) -> ManifestEntry:
+    return ManifestEntry(
+        snapshot_id=snapshot_id,
+        filename=f"snapshot_{snapshot_id}.tbk",
+        sha256="0" * 64,
+        size=1,
+        uploaded_at=datetime.now(timezone.utc),
+    )
+
+def test_manifest_by_id():
+    manifest = create_initial_manifest()
+    for snap_id in ["20240102_000000", "20240101_000000"]:
+        manifest = append_entry(manifest, _entry(snap_id))
+
+    index = manifest.by_id()
+    assert index["20240101_000000"].filename == "snapshot_20240101_000000.tbk"
+    assert index.get("missing") is None
+    assert manifest.by_id() is index
+
+def test_append_entry_keeps_order():
+    manifest = create_initial_manifest()
+    for snap_id in ["20240103_000000", "20240101_000000", "20240104_000000", "20240102_000000"]:
+        manifest = append_entry(manifest, _entry(snap_id))
+    assert [e.snapshot_id for e in manifest.entries] == [
+        "20240101_000000", "20240102_000000", "20240103_000000", "20240104_000000"
+    ]
+
+def test_verify_integrity():
+    manifest = create_initial_manifest()
+    for snap_id in ["20240101_000000", "20240102_000000"]:
+        manifest = append_entry(manifest, _entry(snap_id))
+    assert verify_integrity(manifest) == []
+
+    bad = _entry("20240101_000000").model_copy(update={"sha256": "abc"})
+    manifest = append_entry(manifest, bad)
+    assert verify_integrity(manifest) == [
+        "Duplicate snapshot ID in manifest: 20240101_000000",
+        "Invalid SHA-256 for snapshot 20240101_000000",
+    ]
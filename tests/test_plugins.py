@@ -0,0 +1,40 @@
+from termbackup import plugins
+from termbackup.plugins import load_plugins, validate_plugin
+
+
+class _Plugin:
+    name = "demo"
+    version = "1.0"
+
+    def on_snapshot_pre(self, api): ...
+    def on_snapshot_post(self, api, meta): ...
+    def on_restore_pre(self, api, snapshot_id): ...
+    def on_restore_post(self, api, snapshot_id): ...
+
+class _NotCallable(_Plugin):
+    on_restore_post = "nope"
+
+class _Missing:
+    name = "demo"
+    version = "1.0"
+
+def test_validate_plugin():
+    assert validate_plugin(_Plugin())
+    assert not validate_plugin(_NotCallable())
+    assert not validate_plugin(_Missing())
+
+def test_load_plugins_discovers_once(monkeypatch):
+    calls = []
+
+    def fake_entry_points(group):
+        calls.append(group)
+        return []
+
+    plugins._discover_plugins.cache_clear()
+    monkeypatch.setattr(plugins.importlib.metadata, "entry_points", fake_entry_points)
+    try:
+        assert load_plugins() == []
+        assert load_plugins() == []
+        assert calls == ["termbackup.plugins"]
+    finally:
+        plugins._discover_plugins.cache_clear()
@@ -1,18 +1,28 @@
-import pytest
-import os
-import shutil
 import base64
-from pathlib import Path
-from tempfile import TemporaryDirectory
+import os
 from datetime import datetime, timezone
+from pathlib import Path
 
+import pytest
+
+from termbackup import snapshot
+from termbackup.crypto import (
+    decrypt,
+    derive_key,
+    encrypt,
+    generate_salt,
+    generate_signing_keypair,
+    sign,
+)
+from termbackup.errors import DecryptionError, RestoreExtractionError
 from termbackup.models import Profile
-from termbackup.snapshot import create_snapshot
 from termbackup.restore import restore_snapshot
-from termbackup.crypto import generate_signing_keypair, generate_salt, derive_key, encrypt
+from termbackup.snapshot import MAGIC_BYTES_V7, create_snapshot, get_master_dek
+from termbackup.utils import sha256_file
+
 
 @pytest.fixture
-def mock_profile(tmp_path: Path):
+def mock_profile(tmp_path: Path, config_home):
     source_dir = tmp_path / "source"
     source_dir.mkdir()
     
@@ -23,6 +33,7 @@ def mock_profile(tmp_path: Path):
     master_dek = os.urandom(32)
     kek = derive_key(pwd, salt)
     enc_dek = encrypt(master_dek, kek)
+    priv, pub = generate_signing_keypair()
     
     prof = Profile(
         name="test_profile",
@@ -33,19 +44,22 @@ def mock_profile(tmp_path: Path):
         master_key_enc=base64.b64encode(enc_dek).decode("ascii"),
         master_key_salt=base64.b64encode(salt).decode("ascii"),
         recovery_key_enc="",
-        recovery_key_salt=""
+        recovery_key_salt="",
+        signing_public_key=base64.b64encode(pub).decode("ascii"),
+        signing_private_key_enc=base64.b64encode(encrypt(priv, master_dek)).decode("ascii")
     )
     return prof, pwd, source_dir
 
 def test_snapshot_restore_cycle(mock_profile, tmp_path: Path):
     prof, pwd, source = mock_profile
-    priv, pub = generate_signing_keypair()
+    pub = base64.b64decode(prof.signing_public_key)
     
     # Create Snapshot
-    tbk_path, meta = create_snapshot(prof, pwd, priv)
+    tbk_path, meta = create_snapshot(prof, pwd)
     
     assert tbk_path.exists()
     assert meta.file_count == 1
+    assert meta.sha256 == sha256_file(tbk_path)
     
     # Restore Snapshot
     target_dir = tmp_path / "restore"
@@ -55,3 +69,147 @@ def test_snapshot_restore_cycle(mock_profile, tmp_path: Path):
     
     assert (target_dir / "file1.txt").exists()
     assert (target_dir / "file1.txt").read_text() == "Hello World"
+
+def _restore(tbk_path, prof, pwd, target_dir, pub=None):
+    restore_snapshot(tbk_path, prof, pwd, target_dir, pub)
+    return {
+        p.relative_to(target_dir).as_posix(): p.read_bytes()
+        for p in target_dir.rglob("*")
+        if p.is_file()
+    }
+
+def test_multi_frame_roundtrip(mock_profile, tmp_path: Path, monkeypatch):
+    prof, pwd, source = mock_profile
+    pub = base64.b64decode(prof.signing_public_key)
+    data = os.urandom(10_000)
+    (source / "sub").mkdir()
+    (source / "sub" / "random.bin").write_bytes(data)
+    monkeypatch.setattr(snapshot, "FRAME_SIZE", 512)
+
+    tbk_path, meta = create_snapshot(prof, pwd)
+    assert meta.sha256 == sha256_file(tbk_path)
+
+    files = _restore(tbk_path, prof, pwd, tmp_path / "restore", pub)
+    assert files == {"file1.txt": b"Hello World", "sub/random.bin": data}
+
+def test_tampered_frame_rejected(mock_profile, tmp_path: Path, monkeypatch):
+    prof, pwd, source = mock_profile
+    pub = base64.b64decode(prof.signing_public_key)
+    (source / "random.bin").write_bytes(os.urandom(4096))
+    monkeypatch.setattr(snapshot, "FRAME_SIZE", 512)
+    tbk_path, _ = create_snapshot(prof, pwd)
+
+    raw = bytearray(tbk_path.read_bytes())
+    raw[len(snapshot.MAGIC_BYTES) + snapshot.NONCE_PREFIX_LEN + 20] ^= 1
+    tbk_path.write_bytes(bytes(raw))
+
+    with pytest.raises(RestoreExtractionError, match="Signature"):
+        restore_snapshot(tbk_path, prof, pwd, tmp_path / "signed", pub)
+    with pytest.raises(DecryptionError):
+        restore_snapshot(tbk_path, prof, pwd, tmp_path / "unsigned")
+
+def test_truncated_frames_rejected(mock_profile, tmp_path: Path, monkeypatch):
+    prof, pwd, source = mock_profile
+    (source / "random.bin").write_bytes(os.urandom(4096))
+    monkeypatch.setattr(snapshot, "FRAME_SIZE", 512)
+    tbk_path, _ = create_snapshot(prof, pwd)
+
+    # Drop the final frame but keep a well-formed trailer
+    raw = tbk_path.read_bytes()
+    sig_len = int.from_bytes(raw[-2:], "big")
+    trailer = raw[-(sig_len + 2):]
+    body = raw[:-(sig_len + 2)]
+    offset = len(snapshot.MAGIC_BYTES) + snapshot.NONCE_PREFIX_LEN
+    frames = []
+    while offset < len(body):
+        final, ct_len = snapshot.FRAME_HEADER.unpack_from(body, offset)
+        frames.append((offset, final))
+        offset += snapshot.FRAME_HEADER.size + ct_len
+    assert frames[-1][1] == 1 and all(not final for _, final in frames[:-1])
+    tbk_path.write_bytes(body[:frames[-1][0]] + trailer)
+
+    with pytest.raises(RestoreExtractionError, match="truncated"):
+        restore_snapshot(tbk_path, prof, pwd, tmp_path / "restore")
+
+def test_restore_reads_v7_container(mock_profile, tmp_path: Path):
+    import gzip
+    import io
+    import tarfile
+
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    prof, pwd, _ = mock_profile
+    pub = base64.b64decode(prof.signing_public_key)
+    dek = get_master_dek(prof, pwd)
+    signing_key = decrypt(base64.b64decode(prof.signing_private_key_enc), dek)
+
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb") as gz, tarfile.open(fileobj=gz, mode="w") as tar:
+        ti = tarfile.TarInfo("old.txt")
+        ti.size = 3
+        tar.addfile(ti, io.BytesIO(b"old"))
+    nonce = os.urandom(12)
+    encrypted = AESGCM(dek).encrypt(nonce, buffer.getvalue(), None)
+    signature = sign(encrypted, signing_key)
+    tbk_path = tmp_path / "legacy.tbk"
+    sig_len = len(signature).to_bytes(2, "big")
+    tbk_path.write_bytes(MAGIC_BYTES_V7 + nonce + sig_len + signature + encrypted)
+
+    assert _restore(tbk_path, prof, pwd, tmp_path / "restore", pub) == {"old.txt": b"old"}
+
+def test_prefetched_and_streamed_files_keep_order(mock_profile, tmp_path: Path, monkeypatch):
+    prof, pwd, source = mock_profile
+    monkeypatch.setattr(snapshot, "PREFETCH_MAX_SIZE", 100)
+    expected = {"file1.txt": b"Hello World"}
+    for i in range(30):
+        data = os.urandom(50 if i % 3 else 300)
+        (source / f"f{i:02}.bin").write_bytes(data)
+        expected[f"f{i:02}.bin"] = data
+
+    tbk_path, meta = create_snapshot(prof, pwd)
+    assert meta.file_count == 31
+    assert _restore(tbk_path, prof, pwd, tmp_path / "restore") == expected
+
+def test_rejects_bad_headers(mock_profile, tmp_path: Path):
+    prof, pwd, _ = mock_profile
+    bad = tmp_path / "bad.tbk"
+    cases = [(b"NOPE" + bytes(20), "Invalid magic"), (snapshot.MAGIC_BYTES + bytes(3), "too short")]
+    for raw, message in cases:
+        bad.write_bytes(raw)
+        with pytest.raises(RestoreExtractionError, match=message):
+            restore_snapshot(bad, prof, pwd, tmp_path / "restore")
+
+def test_iter_members_does_not_retain_tarinfo():
+    import io
+    import tarfile
+
+    from termbackup.restore import _iter_members
+
+    class CountingInfo(tarfile.TarInfo):
+        live = 0
+        peak = 0
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            CountingInfo.live += 1
+            CountingInfo.peak = max(CountingInfo.peak, CountingInfo.live)
+
+        def __del__(self):
+            CountingInfo.live -= 1
+
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for i in range(50):
+            info = tarfile.TarInfo(f"f{i}")
+            info.size = 1
+            tar.addfile(info, io.BytesIO(b"x"))
+    buffer.seek(0)
+
+    names = []
+    with tarfile.open(fileobj=buffer, mode="r|", tarinfo=CountingInfo) as tar:
+        for member in _iter_members(tar):
+            names.append(member.name)
+    del member
+    assert names == [f"f{i}" for i in range(50)]
+    # Only the member being processed (plus the one being parsed) is ever alive
+    assert CountingInfo.peak <= 3
@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pytest
+
+from termbackup import utils
+from termbackup.errors import PathTraversalError
+from termbackup.utils import human_size, secure_temp_dir, validate_path, zero_memory
+
+
+def test_validate_path_accepts_nested_paths(tmp_path: Path):
+    assert validate_path(tmp_path / "a" / "b.txt", tmp_path) == (tmp_path / "a" / "b.txt").resolve()
+    assert validate_path(tmp_path, tmp_path) == tmp_path.resolve()
+
+def test_validate_path_rejects_escapes(tmp_path: Path):
+    base = tmp_path / "restore"
+    escapes = [base / ".." / "x.txt", tmp_path / "restore-evil" / "x.txt", Path("/etc/passwd")]
+    for candidate in escapes:
+        with pytest.raises(PathTraversalError):
+            validate_path(candidate, base)
+
+def test_secure_temp_dir_shreds_contents(monkeypatch):
+    monkeypatch.setattr(utils, "SHRED_CHUNK_SIZE", 7)
+    with secure_temp_dir() as temp_dir:
+        (temp_dir / "nested").mkdir()
+        (temp_dir / "nested" / "data.bin").write_bytes(b"x" * 100)
+        (temp_dir / "empty").touch()
+    assert not temp_dir.exists()
+
+def test_zero_memory_clears_buffers():
+    secret = bytearray(b"k" * 64)
+    zero_memory(secret)
+    assert secret == bytearray(64)
+    secret.extend(b"more")  # no lingering buffer export
+
+    backing = bytearray(b"abcdef")
+    zero_memory(memoryview(backing)[1:4])
+    assert backing == bytearray(b"a\0\0\0ef")
+
+    zero_memory(memoryview(b"read-only"))  # silently ignored
+
+def test_human_size_boundaries():
+    assert human_size(0) == "0 B"
+    assert human_size(1023) == "1023 B"
+    assert human_size(1024) == "1.0 KiB"
+    assert human_size(1536) == "1.5 KiB"
+    assert human_size(5 * 1024 ** 3) == "5.0 GiB"
+    assert human_size(2048 * 1024 ** 5) == "2048.0 PiB"
+
+def test_shred_skips_overwrite_on_copy_on_write(tmp_path: Path, monkeypatch):
+    assert utils._is_copy_on_write(tmp_path) in (True, False)
+
+    target = tmp_path / "plain.txt"
+    target.write_bytes(b"secret")
+    monkeypatch.setattr(utils, "_is_copy_on_write", lambda path: True)
+    monkeypatch.setattr(utils.os, "urandom", lambda n: pytest.fail("overwrote a CoW file"))
+    utils.secure_shred_file(target)
+    assert not target.exists()